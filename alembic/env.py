@@ -2,17 +2,11 @@ from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
-import os
 from lingua.database.models import Base
+from lingua.database.connection import database_url
 from alembic import context
 
-_USER = os.getenv("user")
-_PWD = os.getenv("password")
-_HOST = os.getenv("host")
-_PORT = os.getenv("port")
-_DBNAME = os.getenv("dbname")
-
-DATABASE_URL = f"postgresql+psycopg2://{_USER}:{_PWD}@{_HOST}:{_PORT}/{_DBNAME}?sslmode=require"
+DATABASE_URL = database_url()
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -75,7 +69,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            # SQLite can't ALTER most things in place; batch mode recreates the table
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
@@ -0,0 +1,41 @@
+"""Add normalized_word with trigram index to word_definition
+
+Revision ID: 8c3f5d27e9b4
+Revises: 4b7e2c91a3f0
+Create Date: 2026-10-19 11:02:47.913385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3f5d27e9b4'
+down_revision: Union[str, None] = '4b7e2c91a3f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('word_definition', sa.Column('normalized_word', sa.Text(), nullable=True))
+    # text_pattern_ops lets LIKE 'prefix%' use the btree index regardless of collation
+    op.create_index(
+        'ix_word_definition_normalized_word', 'word_definition', ['normalized_word'], unique=False,
+        postgresql_ops={'normalized_word': 'text_pattern_ops'}
+    )
+    op.create_index(
+        'ix_word_definition_normalized_word_trgm', 'word_definition', ['normalized_word'], unique=False,
+        postgresql_using='gin', postgresql_ops={'normalized_word': 'gin_trgm_ops'}
+    )
+    # Existing rows are filled in by `backfill-normalized-words` (crud.backfill_normalized_words)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_word_definition_normalized_word_trgm', table_name='word_definition')
+    op.drop_index('ix_word_definition_normalized_word', table_name='word_definition')
+    op.drop_column('word_definition', 'normalized_word')
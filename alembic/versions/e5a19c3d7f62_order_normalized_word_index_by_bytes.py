@@ -0,0 +1,40 @@
+"""Index word_definition.normalized_word in byte order on PostgreSQL
+
+Revision ID: e5a19c3d7f62
+Revises: b61e0d4a9c27
+Create Date: 2026-10-19 13:02:15.204871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a19c3d7f62'
+down_revision: Union[str, None] = 'b61e0d4a9c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return  # SQLite's index already compares bytes
+    # text_pattern_ops serves LIKE but cannot return rows in ORDER BY order; a "C" btree does both
+    op.drop_index('ix_word_definition_normalized_word', table_name='word_definition')
+    op.create_index(
+        'ix_word_definition_normalized_word_c', 'word_definition', [sa.text('normalized_word COLLATE "C"')], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_word_definition_normalized_word_c', table_name='word_definition')
+    op.create_index(
+        'ix_word_definition_normalized_word', 'word_definition', ['normalized_word'], unique=False,
+        postgresql_ops={'normalized_word': 'text_pattern_ops'}
+    )
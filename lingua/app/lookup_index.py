@@ -0,0 +1,153 @@
+"""
+Compact, memory-mapped dictionary index.
+
+File layout (all integers little-endian uint64)::
+
+    header        magic b"LNGIDX01", entry count n, keys blob size, records blob size
+    key offsets   n + 1 offsets into the keys blob
+    rec offsets   n + 1 offsets into the records blob
+    keys blob     normalized headwords, UTF-8, sorted by bytes
+    records blob  per headword: field count k, k field lengths (uint32), then the
+                  fields, UTF-8: the display word and its definitions
+
+Opening an index maps the file and casts the offset arrays in place, so start-up
+does not depend on the dictionary size and nothing is parsed until it is looked up. Fields are
+length-prefixed rather than separated, so definitions may hold any text,
+line breaks included.
+"""
+import struct
+import mmap
+import os
+
+from lingua.database.normalize import normalize_headword
+
+_MAGIC = b"LNGIDX02"
+_HEADER = struct.Struct("<8sQQQ")
+_OFFSET = struct.Struct("<Q")
+_FIELD_COUNT = struct.Struct("<I")
+
+
+def write_index(path, entries):
+    """
+    Write an index from `entries`, an iterable of (word, definition) pairs in any
+    order. Words normalizing to the same headword are merged. The file is
+    written next to `path` and moved into place, so readers never see a partial index.
+    """
+    records = {}
+    for word, definition in entries:
+        key = normalize_headword(word)
+        if not key:
+            continue
+        _, definitions = records.setdefault(key.encode("utf-8"), (word, []))
+        if definition not in definitions:
+            definitions.append(definition)
+
+    keys = sorted(records)
+    key_offsets, record_offsets = [0], [0]
+    record_blobs = []
+    for key in keys:
+        word, definitions = records[key]
+        fields = [field.encode("utf-8") for field in (word, *definitions)]
+        blob = b"".join([
+            _FIELD_COUNT.pack(len(fields)),
+            struct.pack(f"<{len(fields)}I", *map(len, fields)),
+            *fields,
+        ])
+        record_blobs.append(blob)
+        key_offsets.append(key_offsets[-1] + len(key))
+        record_offsets.append(record_offsets[-1] + len(blob))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(keys), key_offsets[-1], record_offsets[-1]))
+        f.write(struct.pack(f"<{len(key_offsets)}Q", *key_offsets))
+        f.write(struct.pack(f"<{len(record_offsets)}Q", *record_offsets))
+        for key in keys:
+            f.write(key)
+        for blob in record_blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+class LookupIndex:
+    """Read-only view over an index file written by `write_index`."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, keys_size, records_size = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a lookup index of this version, rebuild it")
+
+        view = memoryview(self._map)
+        position = _HEADER.size
+        offsets_size = (self.count + 1) * _OFFSET.size
+        self._key_offsets = view[position:position + offsets_size].cast("Q")
+        position += offsets_size
+        self._record_offsets = view[position:position + offsets_size].cast("Q")
+        position += offsets_size
+        self._keys = view[position:position + keys_size]
+        position += keys_size
+        self._records = view[position:position + records_size]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return self._record(i)
+
+    def _key(self, i):
+        return self._keys[self._key_offsets[i]:self._key_offsets[i + 1]].tobytes()
+
+    def _record(self, i):
+        blob = self._records[self._record_offsets[i]:self._record_offsets[i + 1]]
+        (field_count,) = _FIELD_COUNT.unpack_from(blob, 0)
+        position = _FIELD_COUNT.size + 4 * field_count
+        fields = []
+        for length in struct.unpack_from(f"<{field_count}I", blob, _FIELD_COUNT.size):
+            fields.append(bytes(blob[position:position + length]).decode("utf-8"))
+            position += length
+        word, *definitions = fields
+        return {"word": word, "normalized_word": self._key(i).decode("utf-8"), "definitions": definitions}
+
+    def _lower_bound(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def get(self, word):
+        """The entry of `word` (any spelling variant), or None."""
+        key = normalize_headword(word)
+        if not key:
+            return None
+        key = key.encode("utf-8")
+        i = self._lower_bound(key)
+        if i < self.count and self._key(i) == key:
+            return self._record(i)
+        return None
+
+    def prefix(self, prefix, limit=20):
+        """Entries whose normalized headword starts with `prefix`, in index order."""
+        key = (normalize_headword(prefix) or "").encode("utf-8")
+        results = []
+        i = self._lower_bound(key)
+        while i < self.count and len(results) < limit and self._key(i).startswith(key):
+            results.append(self._record(i))
+            i += 1
+        return results
+
+    def close(self):
+        # Release the exported buffers before closing the map
+        for view in (self._key_offsets, self._record_offsets, self._keys, self._records):
+            view.release()
+        self._map.close()
+        self._file.close()
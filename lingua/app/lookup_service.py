@@ -0,0 +1,181 @@
+"""
+Dictionary lookups served from the memory-mapped index, without a database.
+
+    dictionary-lookup build --index lingua.idx      # compile word_definition into an index
+    dictionary-lookup get --index lingua.idx പദം     # look words up from the command line
+    dictionary-lookup serve --index lingua.idx      # local HTTP front end
+    dictionary-lookup bench --index lingua.idx      # batch lookup latency
+
+HTTP endpoints::
+
+    GET  /lookup?word=പദം             one entry, 404 if unknown
+    GET  /prefix?q=പ&limit=20         entries starting with a prefix
+    POST /lookup {"words": [...]}     batch lookup, {"results": {word: entry or null}}
+
+Only ``build`` touches the database; the other commands open the index file
+and are ready as soon as it is mapped.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from functools import lru_cache
+import argparse
+import logging
+import random
+import json
+import time
+import sys
+
+from lingua.app.lookup_index import LookupIndex, write_index
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_INDEX = "lingua.idx"
+_DEFAULT_HOST = "127.0.0.1"
+_DEFAULT_PORT = 8765
+_DEFAULT_CACHE_SIZE = 65536
+_MAX_BATCH_SIZE = 10000
+
+
+class Dictionary:
+    """A `LookupIndex` with an LRU cache in front of the exact lookups."""
+
+    def __init__(self, index_path, cache_size=_DEFAULT_CACHE_SIZE):
+        self.index = LookupIndex(index_path)
+        self.lookup = lru_cache(maxsize=cache_size)(self.index.get)
+
+    def lookup_many(self, words):
+        return {word: self.lookup(word) for word in words}
+
+    def prefix(self, prefix, limit=20):
+        return self.index.prefix(prefix, limit)
+
+    def close(self):
+        self.lookup.cache_clear()
+        self.index.close()
+
+
+def build(index_path):
+    """Compile the live rows of word_definition into `index_path`."""
+    from lingua.database import crud
+
+    start = time.perf_counter()
+    count = write_index(index_path, crud.iter_word_definitions())
+    logger.info(f"✅ Wrote {count} headwords to {index_path} in {time.perf_counter() - start:.1f}s")
+    return count
+
+
+def make_handler(dictionary):
+    class _LookupHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = parse_qs(url.query)
+            if url.path == "/lookup" and params.get("word"):
+                entry = dictionary.lookup(params["word"][0])
+                self._send_json(200 if entry else 404, entry or {"error": "not found"})
+            elif url.path == "/prefix" and params.get("q"):
+                try:
+                    limit = int(params.get("limit", ["20"])[0])
+                except ValueError:
+                    limit = 0
+                if limit < 1:
+                    self._send_json(400, {"error": "limit must be a positive integer"})
+                    return
+                self._send_json(200, {"results": dictionary.prefix(params["q"][0], min(limit, _MAX_BATCH_SIZE))})
+            else:
+                self._send_json(400, {"error": "expected /lookup?word=... or /prefix?q=..."})
+
+        def do_POST(self):
+            if urlsplit(self.path).path != "/lookup":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                words = json.loads(self.rfile.read(length))["words"]
+            except (ValueError, KeyError, TypeError):
+                words = None
+            if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+                self._send_json(400, {"error": 'expected {"words": [...]} with a list of strings'})
+                return
+            if len(words) > _MAX_BATCH_SIZE:
+                self._send_json(413, {"error": f"at most {_MAX_BATCH_SIZE} words per request"})
+                return
+            self._send_json(200, {"results": dictionary.lookup_many(words)})
+
+        def log_message(self, format, *args):
+            pass  # per-request logging would cost more than the lookup
+
+    return _LookupHandler
+
+
+def serve(dictionary, host=_DEFAULT_HOST, port=_DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), make_handler(dictionary))
+    logger.info(f"📖 Serving {len(dictionary.index)} headwords on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def bench(dictionary, batches=200, batch_size=100, seed=0):
+    """Time batch lookups of headwords drawn from the index (half of them misspelt); returns latencies in ms."""
+    rng = random.Random(seed)
+    index = dictionary.index
+    sample = [index[rng.randrange(len(index))]["word"] for _ in range(min(len(index), batches * batch_size))]
+    timings = []
+    for _ in range(batches):
+        words = [w if rng.random() < 0.5 else w + "x" for w in rng.choices(sample, k=batch_size)]
+        start = time.perf_counter()
+        dictionary.lookup_many(words)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-mapped dictionary lookups")
+    parser.add_argument("command", choices=["build", "get", "serve", "bench"])
+    parser.add_argument("words", nargs="*", help="words for `get`; `-` reads one word per line from stdin")
+    parser.add_argument("--index", default=_DEFAULT_INDEX)
+    parser.add_argument("--host", default=_DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=_DEFAULT_PORT)
+    parser.add_argument("--cache-size", type=int, default=_DEFAULT_CACHE_SIZE)
+    parser.add_argument("--prefix", action="store_true", help="`get` returns entries starting with each word")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "build":
+        build(args.index)
+        return
+
+    start = time.perf_counter()
+    dictionary = Dictionary(args.index, args.cache_size)
+    logger.info(f"Opened {args.index} in {(time.perf_counter() - start) * 1000:.2f} ms")
+    try:
+        if args.command == "serve":
+            serve(dictionary, args.host, args.port)
+        elif args.command == "bench":
+            timings = bench(dictionary)
+            p50, p95, p99 = (timings[int(q * (len(timings) - 1))] for q in (0.5, 0.95, 0.99))
+            print(f"batch of 100: p50 {p50:.3f} ms, p95 {p95:.3f} ms, p99 {p99:.3f} ms")
+        else:
+            words = [line.strip() for line in sys.stdin if line.strip()] if args.words == ["-"] else args.words
+            for word in words:
+                result = dictionary.prefix(word) if args.prefix else dictionary.lookup(word)
+                print(json.dumps({word: result}, ensure_ascii=False))
+    finally:
+        dictionary.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Loads the datuk Malayalam dictionary (``data/datuk/files/datuk``, tab separated
+with ``from_content``/``to_content`` columns) into glossary_entry/glossary_term
+as the ``datuk`` source, so the Samam terms can be split against it with
+``crud.get_glossary_terms(not_in_source="datuk")``.
+
+Cells are cleaned the way ``preprocess.ipynb`` does it: a trailing sense number
+is dropped from both word and meaning.
+"""
+from itertools import count
+import pathlib
+import csv
+import re
+
+from lingua.data import glossary_loader
+
+_DATUK_FILE = pathlib.Path("data/datuk/files/datuk")
+_SOURCE = "datuk"
+_LANGUAGE = "ml"
+_TRAILING_NUMBER = re.compile(r"\s?\d+$")
+
+
+def clean_datuk_cell(text):
+    return _TRAILING_NUMBER.sub("", text).strip()
+
+
+def iter_datuk_rows(path=_DATUK_FILE):
+    """Yield (row_number, terms) for each row of the datuk file; rows without a word have no terms."""
+    with glossary_loader.open_glossary_file(path) as f:
+        reader = csv.DictReader(f, delimiter="\t")
+        missing = {"from_content", "to_content"} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path} has no {', '.join(sorted(missing))} column")
+
+        for row_number, row in zip(count(1), reader):
+            word = clean_datuk_cell(row["from_content"] or "")
+            if not word:
+                yield row_number, []
+                continue
+            meaning = clean_datuk_cell(row["to_content"] or "")
+            yield row_number, [(_LANGUAGE, row["from_content"], word, meaning or None)]
+
+
+def iter_datuk_batches(path=_DATUK_FILE, source=_SOURCE, batch_size=glossary_loader.DEFAULT_BATCH_SIZE):
+    """Yield (entry_rows, term_rows) batches of column dicts from the datuk file."""
+    return glossary_loader.iter_batches(iter_datuk_rows(path), source, batch_size)
+
+
+def load_datuk(path=_DATUK_FILE, source=_SOURCE, batch_size=glossary_loader.DEFAULT_BATCH_SIZE):
+    """Replace the `source` glossary in the database with the contents of `path`."""
+    return glossary_loader.load(source, iter_datuk_batches(path, source, batch_size))
+
+
+def main():
+    glossary_loader.main("Load the datuk dictionary into the glossary tables", iter_datuk_batches, _DATUK_FILE, _SOURCE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Rules for pulling a word's definitions out of a Wiktionary page.
+
+The same rule is applied to rendered HTML (scraped pages) and to raw wikitext
+(dumps): definitions are the items of the first list that follows the bold
+headword, an exact headword match being preferred over a partial one.
+"""
+from urllib.parse import unquote
+from parsel import Selector
+import re
+
+_LIST_LINE = re.compile(r"^[#*][#*:;]*")
+_BOLD = re.compile(r"'''(.+?)'''")
+_LINK = re.compile(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]")
+_EXTERNAL_LINK = re.compile(r"\[[a-z]+://\S+\s*([^\]]*)\]")
+_TEMPLATE = re.compile(r"\{\{[^{}]*\}\}")
+_TAG = re.compile(r"<[^>]+>")
+_REF = re.compile(r"<ref[^>/]*>.*?</ref>|<ref[^>]*/>", re.DOTALL)
+_QUOTES = re.compile(r"'{2,}")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def word_from_url(url):
+    """Headword of a word page, taken from the last segment of its URL."""
+    return unquote(url.split("/")[-1])
+
+
+def extract_definitions(page_html, word):
+    """
+    Extracts the definitions of `word` from a rendered Wiktionary page.
+    Definitions are the list items that follow the bold headword.
+    """
+    # Parse content using Selector
+    sel = Selector(text=page_html)
+    content_div = sel.xpath('//*[@id="mw-content-text"]/div[1]')
+    
+    # Find all <b> tags that exactly match the word
+    bolds = content_div.xpath(f'.//b[normalize-space(.)="{word}"]')
+    
+    # If direct match not found, try a more relaxed search
+    if not bolds:
+        bolds = content_div.xpath(f'.//b[contains(., "{word}")]')
+    
+    definitions = []
+    
+    # Process each bold tag that might be the word heading
+    for bold in bolds:
+        # Look for definition lists after the bold tag
+        ancestor = bold.xpath('./ancestor::*[self::p or self::div][1]')
+        
+        # Find all list elements (ordered or unordered) that follow the ancestor
+        lists = ancestor.xpath('./following-sibling::*[self::ul or self::ol][position()=1]')
+        
+        for lst in lists:
+            # Extract each list item as a definition
+            list_items = lst.xpath('./li')
+            for li in list_items:
+                definition_text = li.xpath('normalize-space(string())').get()
+                if definition_text and len(definition_text.strip()) > 0:
+                    definitions.append(definition_text)
+        
+        # If no definitions found using that approach, try a fallback method
+        if not definitions:
+            fallback_lis = bold.xpath('./following::*[self::ul or self::ol][1]/li')
+            for li in fallback_lis:
+                definition_text = li.xpath('normalize-space(string())').get()
+                if definition_text and len(definition_text.strip()) > 0:
+                    definitions.append(definition_text)
+    
+    return definitions
+
+
+def _strip_wiki_markup(text):
+    """Reduce a line of wikitext to its visible text, like `string()` does for HTML."""
+    text = _REF.sub("", text)
+    # Templates can nest, strip from the innermost outwards
+    previous = None
+    while previous != text:
+        previous, text = text, _TEMPLATE.sub("", text)
+    text = _LINK.sub(r"\1", text)
+    text = _EXTERNAL_LINK.sub(r"\1", text)
+    text = _TAG.sub("", text)
+    text = _QUOTES.sub("", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _first_list_after(lines, start):
+    """Items of the first list found at or after line `start`; nested lines join their parent item."""
+    index = start
+    while index < len(lines) and not _LIST_LINE.match(lines[index]):
+        index += 1
+
+    items = []
+    list_type = lines[index][0] if index < len(lines) else None
+    # A change from '#' to '*' (or back) starts a new HTML list
+    while index < len(lines) and _LIST_LINE.match(lines[index]) and lines[index][0] == list_type:
+        marker = _LIST_LINE.match(lines[index]).group(0)
+        text = lines[index][len(marker):].lstrip(":*# ")
+        if len(marker) == 1 or not items:
+            items.append(text)
+        else:
+            items[-1] = f"{items[-1]} {text}"
+        index += 1
+    return items
+
+
+def extract_definitions_from_wikitext(wikitext, word):
+    """
+    Extracts the definitions of `word` from the raw wikitext of its page, using
+    the same bold-headword-then-list rule as `extract_definitions`.
+    """
+    lines = wikitext.splitlines()
+
+    # Find all bold headwords that exactly match the word
+    bold_lines = [
+        i for i, line in enumerate(lines)
+        if any(_strip_wiki_markup(bold) == word for bold in _BOLD.findall(line))
+    ]
+
+    # If direct match not found, try a more relaxed search
+    if not bold_lines:
+        bold_lines = [
+            i for i, line in enumerate(lines)
+            if any(word in _strip_wiki_markup(bold) for bold in _BOLD.findall(line))
+        ]
+
+    definitions = []
+    for i in bold_lines:
+        for item in _first_list_after(lines, i + 1):
+            definition_text = _strip_wiki_markup(item)
+            if definition_text:
+                definitions.append(definition_text)
+
+    return definitions
@@ -0,0 +1,75 @@
+"""
+What the glossary loaders (``samam_glossary_loader``, ``datuk_glossary_loader``)
+share: opening a source file, turning its parsed rows into glossary_entry and
+glossary_term batches, replacing the source in the database, and the command line.
+
+A loader only parses its own file into ``(row_number, terms)`` pairs, with terms
+a list of ``(language, raw_text, word, meaning)`` tuples.
+"""
+import argparse
+import logging
+import uuid
+import time
+
+from lingua.database.crud import replace_glossary
+from lingua.database.normalize import normalize_headword
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def open_glossary_file(path):
+    """Open a tab separated glossary file for csv, refusing a git-lfs pointer checked out in its place."""
+    f = open(path, encoding="utf-8", newline="")
+    if f.readline().startswith("version https://git-lfs"):
+        f.close()
+        raise ValueError(f"{path} is a git-lfs pointer; run `git lfs pull` first")
+    f.seek(0)
+    return f
+
+
+def iter_batches(rows, source, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield (entry_rows, term_rows) batches of column dicts from `rows`; rows without terms are skipped."""
+    entry_rows, term_rows = [], []
+    for row_number, terms in rows:
+        if not terms:
+            continue
+        entry_uuid = uuid.uuid4()
+        entry_rows.append({"entry_uuid": entry_uuid, "source": source, "row_number": row_number})
+        for language, raw_text, word, meaning in terms:
+            term_rows.append({
+                "term_uuid": uuid.uuid4(),
+                "entry_uuid": entry_uuid,
+                "language": language,
+                "raw_text": raw_text,
+                "word": word,
+                "meaning": meaning,
+                "normalized_word": normalize_headword(word),
+            })
+        if len(entry_rows) >= batch_size:
+            yield entry_rows, term_rows
+            entry_rows, term_rows = [], []
+    if entry_rows:
+        yield entry_rows, term_rows
+
+
+def load(source, batches):
+    """Replace the `source` glossary in the database with `batches`. Returns (entries, terms)."""
+    start = time.perf_counter()
+    entries, terms = replace_glossary(source, batches)
+    elapsed = time.perf_counter() - start
+    logger.info(f"✅ Loaded {entries} {source} entries ({terms} terms) in {elapsed:.1f}s ({terms / max(elapsed, 1e-9):.0f} terms/sec)")
+    return entries, terms
+
+
+def main(description, iter_source_batches, default_path, default_source):
+    """Command line of a loader; `iter_source_batches(path, source, batch_size)` yields its batches."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("path", nargs="?", default=str(default_path))
+    parser.add_argument("--source", default=default_source)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    load(args.source, iter_source_batches(args.path, args.source, args.batch_size))
@@ -0,0 +1,221 @@
+"""
+End-to-end crawl load test against a local synthetic wiki.
+
+``python -m lingua.data.load_test --alphabets 10 --words 2000 --latency 0.02 --error-rate 0.01``
+
+Starts a `StandInCrawlWiki` with the requested shape, points a scratch
+database at it (SQLite under a temporary directory unless ``--database-url``
+is given) and runs the real scrapers:
+
+1. ``urls``: `url_scrapper.scrape_alphabet_url` and `scrape_word_url_per_alphabet`
+2. ``definitions``: `wiktionary_train_data_extractor.scrape_definitions_from_db`
+
+For each phase it reports pages/sec, DB rows/sec, how many of the expected
+rows arrived, and the peak RSS of the whole process tree (the browsers and
+parse workers included), sampled from /proc.
+"""
+from sqlalchemy import func
+import tempfile
+import argparse
+import resource
+import threading
+import asyncio
+import logging
+import json
+import glob
+import time
+import os
+
+from lingua.data import metrics, rate_control
+from lingua.data.stand_in_server import StandInCrawlWiki, start_server, server_url
+from lingua.data.synthetic_wiki import synthetic_pages
+from lingua.database import connection
+from lingua.database.models import WordUrl, WordDefinition
+
+logger = logging.getLogger(__name__)
+
+_PHASES = ("urls", "definitions")
+_RSS_SAMPLE_INTERVAL = 0.25
+
+
+def _process_tree_rss(root_pid):
+    """Resident memory in bytes of `root_pid` and all its descendants, from /proc."""
+    parents = {}
+    for stat_path in glob.glob("/proc/[0-9]*/stat"):
+        try:
+            with open(stat_path) as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses; fields resume after the last ")"
+        pid = int(stat.split(" ", 1)[0])
+        parents[pid] = int(stat.rsplit(")", 1)[1].split()[1])
+
+    tree, frontier = {root_pid}, [root_pid]
+    while frontier:
+        parent = frontier.pop()
+        children = [pid for pid, ppid in parents.items() if ppid == parent and pid not in tree]
+        tree.update(children)
+        frontier.extend(children)
+
+    total = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            continue
+    return total
+
+
+class RssSampler:
+    """Samples the RSS of this process tree on a background thread and keeps the peak."""
+
+    def __init__(self, interval=_RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._available = os.path.exists(f"/proc/{os.getpid()}/statm")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _process_tree_rss(os.getpid()))
+
+    def __enter__(self):
+        self.peak = 0
+        if self._available:
+            self.peak = _process_tree_rss(os.getpid())
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._available:
+            self._thread.join()
+            self.peak = max(self.peak, _process_tree_rss(os.getpid()))
+        else:
+            # Without /proc fall back to the largest single process (ru_maxrss is in KiB on Linux)
+            usage = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+            self.peak = usage * 1024
+
+
+def _count_rows(column):
+    session = connection.Session()
+    try:
+        return session.query(func.count(column)).scalar()
+    finally:
+        session.close()
+
+
+async def _crawl_word_urls(base_url, seen_urls_path):
+    from playwright.async_api import async_playwright
+    from lingua.data import url_scrapper
+    from lingua.database.crud import get_all_alphabets
+
+    async with async_playwright() as playwright:
+        await url_scrapper.scrape_alphabet_url(playwright, f"{base_url}{StandInCrawlWiki.INDEX_PATH}")
+        await url_scrapper.scrape_word_url_per_alphabet(playwright, get_all_alphabets(), seen_urls_path=seen_urls_path)
+
+
+def _crawl_definitions():
+    from playwright.sync_api import sync_playwright
+    from lingua.data import wiktionary_train_data_extractor
+
+    with sync_playwright() as playwright:
+        wiktionary_train_data_extractor.scrape_definitions_from_db(playwright)
+
+
+def _run_phase(name, crawl, count_column, expected_rows):
+    pages_before = metrics.PAGES.value
+    rows_before = _count_rows(count_column)
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        crawl()
+        elapsed = time.perf_counter() - start
+    pages = metrics.PAGES.value - pages_before
+    rows = _count_rows(count_column) - rows_before
+    result = {
+        "phase": name,
+        "seconds": round(elapsed, 2),
+        "pages": pages,
+        "pages_per_sec": round(pages / elapsed, 1),
+        "db_rows": rows,
+        "db_rows_per_sec": round(rows / elapsed, 1),
+        "expected_rows": expected_rows,
+        "peak_rss_mb": round(rss.peak / 2**20, 1),
+    }
+    logger.info(f"🏁 {name}: {result}")
+    return result
+
+
+def run(n_alphabets=5, words_per_alphabet=500, listing_page_size=200, latency=0.01, error_rate=0.0,
+        capacity=64, max_rps=200.0, max_concurrency=16, database_url=None, workdir=None, phases=_PHASES):
+    """Run the crawl `phases` against a fresh stand-in; returns the per-phase results and server counters."""
+    workdir = workdir or tempfile.mkdtemp(prefix="lingua_load_test_")
+    seen_urls_path = os.path.join(workdir, "seen_urls.bin")
+    connection.configure(database_url or f"sqlite:///{os.path.join(workdir, 'load_test.db')}")
+
+    from lingua.database.crud import init_db
+    init_db()
+
+    pages = list(synthetic_pages(n_alphabets, words_per_alphabet))
+    wiki = StandInCrawlWiki(
+        pages, listing_page_size=listing_page_size, base_latency=latency, capacity=capacity, error_rate=error_rate
+    )
+    server = start_server(wiki)
+    wiki.base_url = server_url(server)
+    rate_control.configure_host(wiki.base_url, max_rps=max_rps, max_concurrency=max_concurrency)
+    logger.info(f"🧪 Stand-in wiki with {len(wiki.titles)} words on {wiki.base_url}, working in {workdir}")
+
+    articles = [page for page in pages if page.ns == 0 and not page.redirect]
+    results = []
+    try:
+        if "urls" in phases:
+            results.append(_run_phase("urls", lambda: asyncio.run(_crawl_word_urls(wiki.base_url, seen_urls_path)), WordUrl.word_uuid, len(articles)))
+        if "definitions" in phases:
+            expected = sum(len(page.definitions) for page in articles)
+            results.append(_run_phase("definitions", _crawl_definitions, WordDefinition.definition_uuid, expected))
+    finally:
+        server.shutdown()
+
+    return {
+        "workdir": workdir,
+        "phases": results,
+        "server": {"requests": wiki.requests, "throttled": wiki.throttled},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the scrapers against a local synthetic wiki")
+    parser.add_argument("--alphabets", type=int, default=5)
+    parser.add_argument("--words", type=int, default=500, help="words per alphabet")
+    parser.add_argument("--listing-page-size", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01, help="base response latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503")
+    parser.add_argument("--capacity", type=int, default=64, help="requests in flight before the stand-in slows down")
+    parser.add_argument("--max-rps", type=float, default=200.0)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--database-url", default=None, help="defaults to a SQLite file in the work directory")
+    parser.add_argument("--phases", nargs="+", choices=_PHASES, default=list(_PHASES))
+    parser.add_argument("--json", default=None, help="also write the report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    report = run(
+        args.alphabets, args.words, args.listing_page_size, args.latency, args.error_rate, args.capacity,
+        args.max_rps, args.max_concurrency, args.database_url, phases=args.phases,
+    )
+
+    print(f"{'phase':>12} {'seconds':>8} {'pages/s':>8} {'rows/s':>8} {'rows':>14} {'peak RSS':>10}")
+    for r in report["phases"]:
+        rows = f"{r['db_rows']}/{r['expected_rows']}"
+        print(f"{r['phase']:>12} {r['seconds']:>8} {r['pages_per_sec']:>8} {r['db_rows_per_sec']:>8} {rows:>14} {r['peak_rss_mb']:>8} MB")
+    print(f"server: {report['server']['requests']} requests, {report['server']['throttled']} throttled")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
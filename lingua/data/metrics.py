@@ -0,0 +1,214 @@
+"""
+Stage-level metrics for the scrapers.
+
+Counters and fixed-bucket histograms are plain Python objects, so recording a
+sample on the hot path is a ``perf_counter`` call and a ``bisect``. The values
+are exposed in Prometheus text format on a local HTTP endpoint and dumped as a
+JSON summary when the process exits.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from contextlib import contextmanager
+import threading
+import logging
+import atexit
+import bisect
+import json
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_HOST = "127.0.0.1"
+_DEFAULT_PORT = 9108
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    """Monotonically increasing counter."""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def render(self, labels):
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+            f"{self.name}{{{labels}}} {self.value}",
+        ]
+
+    def summary(self):
+        return self.value
+
+
+class Histogram:
+    """Cumulative fixed-bucket histogram of durations in seconds."""
+
+    def __init__(self, name, help_text, buckets=_DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # One slot per bucket plus the implicit +Inf bucket
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self):
+        """Observe the wall-clock duration of the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside the matching bucket."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for upper, bucket_count in zip(self.buckets, self.bucket_counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = upper
+        return self.buckets[-1]
+
+    def render(self, labels):
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        cumulative = 0
+        for upper, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{{labels},le="{upper}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{self.name}_count{{{labels}}} {self.count}")
+        return lines
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+class MetricsRegistry:
+    """Holds every metric of the running scraper and knows how to export them."""
+
+    def __init__(self):
+        self.scraper = "unknown"
+        self._metrics = {}
+        self._server = None
+        self._started_at = time.time()
+
+    def counter(self, name, help_text):
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, help_text)
+        return self._metrics[name]
+
+    def histogram(self, name, help_text, buckets=_DEFAULT_BUCKETS):
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, help_text, buckets)
+        return self._metrics[name]
+
+    def render_prometheus(self):
+        labels = f'scraper="{self.scraper}"'
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render(labels))
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        return {
+            "scraper": self.scraper,
+            "elapsed_seconds": round(time.time() - self._started_at, 3),
+            "metrics": {name: metric.summary() for name, metric in self._metrics.items()},
+        }
+
+    def start_http_server(self, port, host=_DEFAULT_HOST):
+        """Serve ``/metrics`` from a daemon thread so the scraper loop is never blocked."""
+        registry = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep scrape requests out of the scraper logs
+
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        return self._server
+
+    def write_summary(self, path):
+        summary = self.summary()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        logger.info(f"📊 Metrics summary written to {path}")
+        return summary
+
+
+REGISTRY = MetricsRegistry()
+
+FETCH_SECONDS = REGISTRY.histogram("lingua_fetch_seconds", "Time spent navigating to a page.")
+WAIT_SECONDS = REGISTRY.histogram("lingua_wait_seconds", "Time spent waiting for content selectors.")
+PARSE_SECONDS = REGISTRY.histogram("lingua_parse_seconds", "Time spent parsing page HTML.")
+PARSE_QUEUE_SECONDS = REGISTRY.histogram(
+    "lingua_parse_queue_seconds", "Time a page waited in the parse pool (batching, queueing, IPC) on top of parsing."
+)
+DB_WRITE_SECONDS = REGISTRY.histogram("lingua_db_write_seconds", "Time spent writing results to the database.")
+
+PAGES = REGISTRY.counter("lingua_pages_total", "Pages fetched.")
+LINKS = REGISTRY.counter("lingua_links_total", "Links extracted from listing pages.")
+DEFINITIONS = REGISTRY.counter("lingua_definitions_total", "Definitions extracted from word pages.")
+TIMEOUTS = REGISTRY.counter("lingua_timeouts_total", "Navigation or selector timeouts.")
+RETRIES = REGISTRY.counter("lingua_retries_total", "Retried requests.")
+
+
+def setup_metrics(scraper):
+    """
+    Label the registry with the scraper name, start the Prometheus endpoint and
+    register the JSON summary to be written at exit.
+
+    The port comes from ``LINGUA_METRICS_PORT`` (``0`` disables the endpoint) and
+    the summary path from ``LINGUA_METRICS_SUMMARY``.
+    """
+    REGISTRY.scraper = scraper
+
+    port = int(os.getenv("LINGUA_METRICS_PORT", _DEFAULT_PORT))
+    if port:
+        try:
+            REGISTRY.start_http_server(port)
+            logger.info(f"📈 Serving Prometheus metrics on http://{_DEFAULT_HOST}:{port}/metrics")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not start metrics endpoint on port {port}: {e}")
+
+    summary_path = os.getenv("LINGUA_METRICS_SUMMARY", f"metrics_{scraper}.json")
+    atexit.register(REGISTRY.write_summary, summary_path)
+    return REGISTRY
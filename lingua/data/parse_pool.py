@@ -0,0 +1,235 @@
+"""
+Process-pool parsing stage for the scrapers.
+
+parsel/lxml parsing is CPU bound and would otherwise run on the same thread as
+the browser driving and the DB calls. `ParsePool` ships page HTML to worker
+processes and returns only the compact results (lists of URLs or definitions).
+Requests are grouped into batches to amortize the IPC cost, and the number of
+batches in flight is bounded so memory stays flat when parsing falls behind;
+asyncio callers wait for a free slot without blocking the event loop.
+Workers time each parse themselves; the pool records it in ``PARSE_SECONDS``
+and the rest of the round trip in ``PARSE_QUEUE_SECONDS``.
+
+``python -m lingua.data.parse_pool`` reports pages/sec for 1..N workers on
+synthetic pages.
+"""
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from urllib.parse import urljoin
+from collections import deque
+from itertools import islice
+from parsel import Selector
+import threading
+import argparse
+import asyncio
+import time
+import os
+
+from lingua.data.definition_rules import extract_definitions
+from lingua.data import metrics
+
+_BASE_URL = "https://ml.wiktionary.org"
+_DEFAULT_BATCH_SIZE = 8
+_DEFAULT_LINGER = 0.005  # seconds a partial batch may wait for more async requests
+
+
+def extract_links(page_html, selector_used, base_url=_BASE_URL):
+    """Absolute URLs of every link inside `selector_used` on an alphabet listing page."""
+    sel = Selector(text=page_html)
+    container = sel.xpath(selector_used)
+    links = container.xpath('.//a')
+
+    extracted = []
+    for link in links:
+        href = link.xpath('.//@href').get()
+        if href:
+            absolute_url = urljoin(base_url, href)
+            extracted.append(absolute_url)
+
+    return extracted
+
+
+_PARSERS = {
+    "links": extract_links,
+    "definitions": extract_definitions,
+}
+
+
+def _parse_batch(tasks):
+    """Worker entry point: run each (kind, args) task, isolating failures per task. Returns (ok, value, seconds)."""
+    results = []
+    for kind, args in tasks:
+        start = time.perf_counter()
+        try:
+            value = _PARSERS[kind](*args)
+            results.append((True, value, time.perf_counter() - start))
+        except Exception as e:
+            results.append((False, f"{type(e).__name__}: {e}", time.perf_counter() - start))
+    return results
+
+
+class ParsePool:
+    """Batches parse requests onto a process pool with a bounded number of batches in flight."""
+
+    def __init__(self, workers=None, batch_size=_DEFAULT_BATCH_SIZE, max_in_flight=None, linger=_DEFAULT_LINGER):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.linger = linger
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._batch = []
+        self._in_flight = deque()
+        self._lock = threading.Lock()
+        self._async_slots = None
+        self._flush_scheduled = False
+        self._linger_tasks = set()  # the event loop only holds weak references to tasks
+
+    # ---------- sync API ----------
+
+    def submit(self, kind, *args):
+        """Queue one parse task; returns a Future with its result. Blocks while too many batches are in flight."""
+        item, full = self._add(kind, args)
+        if full:
+            self.flush()
+        return item
+
+    def flush(self):
+        """Send the pending partial batch to the workers."""
+        batch = self._take_batch()
+        if not batch:
+            return
+        self._wait_for_capacity()
+        self._send(batch)
+
+    def _add(self, kind, args):
+        item = Future()
+        item.submitted_at = time.perf_counter()
+        with self._lock:
+            self._batch.append(((kind, args), item))
+            return item, len(self._batch) >= self.batch_size
+
+    def _take_batch(self):
+        with self._lock:
+            batch, self._batch = self._batch, []
+            self._flush_scheduled = False
+        return batch
+
+    def _send(self, batch):
+        batch_future = self._executor.submit(_parse_batch, [task for task, _ in batch])
+        batch_future.add_done_callback(lambda f: self._resolve(f, [item for _, item in batch]))
+        self._in_flight.append(batch_future)
+
+    def _has_capacity(self):
+        self._in_flight = deque(f for f in self._in_flight if not f.done())
+        return len(self._in_flight) < self.max_in_flight
+
+    def _wait_for_capacity(self):
+        while not self._has_capacity():
+            wait(self._in_flight, return_when=FIRST_COMPLETED)
+
+    @staticmethod
+    def _resolve(batch_future, items):
+        if batch_future.exception() is not None:
+            for item in items:
+                item.set_exception(batch_future.exception())
+            return
+        finished_at = time.perf_counter()
+        for item, (ok, value, seconds) in zip(items, batch_future.result()):
+            metrics.PARSE_SECONDS.observe(seconds)
+            metrics.PARSE_QUEUE_SECONDS.observe(max(0.0, finished_at - item.submitted_at - seconds))
+            if ok:
+                item.set_result(value)
+            else:
+                item.set_exception(RuntimeError(value))
+
+    # ---------- asyncio API ----------
+
+    async def parse(self, kind, *args):
+        """
+        Await the result of one parse task from asyncio code. Concurrent callers
+        share batches; a partial batch is sent after `linger` seconds.
+        """
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_in_flight * self.batch_size)
+        async with self._async_slots:
+            item, full = self._add(kind, args)
+            if full:
+                await self._flush_async()
+            with self._lock:
+                schedule = bool(self._batch) and not self._flush_scheduled
+                self._flush_scheduled = self._flush_scheduled or schedule
+            if schedule:
+                task = asyncio.create_task(self._linger_flush())
+                self._linger_tasks.add(task)
+                task.add_done_callback(self._linger_tasks.discard)
+            return await asyncio.wrap_future(item)
+
+    async def _flush_async(self):
+        """`flush` for the event loop: the wait for a free slot runs in a thread, the check and send on the loop."""
+        batch = self._take_batch()
+        if not batch:
+            return
+        while not self._has_capacity():
+            await asyncio.get_running_loop().run_in_executor(None, wait, list(self._in_flight), None, FIRST_COMPLETED)
+        self._send(batch)
+
+    async def _linger_flush(self):
+        await asyncio.sleep(self.linger)
+        await self._flush_async()
+
+    # ---------- lifecycle ----------
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(n_pages=2000, max_workers=None, batch_size=_DEFAULT_BATCH_SIZE):
+    """Parse `n_pages` synthetic word pages inline and with 1..`max_workers` workers; returns pages/sec per setting."""
+    from lingua.data.synthetic_wiki import synthetic_pages, page_html
+
+    articles = (page for page in synthetic_pages(words_per_alphabet=n_pages) if page.ns == 0 and not page.redirect)
+    pages = [(page_html(page), page.title) for page in islice(articles, n_pages)]
+    results = {}
+
+    start = time.perf_counter()
+    for html, word in pages:
+        extract_definitions(html, word)
+    results["inline"] = len(pages) / (time.perf_counter() - start)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    for workers in range(1, max_workers + 1):
+        with ParsePool(workers=workers, batch_size=batch_size) as pool:
+            # Warm the workers up so process start-up is not measured
+            warm_up = [pool.submit("definitions", *pages[0]) for _ in range(workers * batch_size)]
+            pool.flush()
+            wait(warm_up)
+            start = time.perf_counter()
+            futures = [pool.submit("definitions", html, word) for html, word in pages]
+            pool.flush()
+            wait(futures)
+            results[workers] = len(pages) / (time.perf_counter() - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure parse throughput for 1..N worker processes")
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=_DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    results = benchmark(args.pages, args.max_workers, args.batch_size)
+    baseline = results["inline"]
+    print(f"{'workers':>8} {'pages/sec':>10} {'speedup':>8}")
+    for workers, pages_per_sec in results.items():
+        print(f"{workers:>8} {pages_per_sec:>10.1f} {pages_per_sec / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
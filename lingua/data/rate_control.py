@@ -0,0 +1,269 @@
+"""
+Adaptive concurrency and rate control shared by the scrapers.
+
+Every request to a host goes through that host's `RateController`:
+
+* a token bucket enforces a global requests/sec ceiling,
+* an AIMD window grows the number of in-flight requests by one per window of
+  successful responses while latency stays near its baseline, and halves it on
+  errors, latency spikes or 429s,
+* a ``Retry-After`` header pauses the host until the server says otherwise.
+
+The controller itself is thread-safe; `slot()` is used from asyncio code and
+`sync_slot()` from the sync Playwright API.
+"""
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from datetime import datetime, timezone
+import threading
+import asyncio
+import logging
+import time
+import os
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from lingua.data import metrics
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_RPS = float(os.getenv("LINGUA_MAX_RPS", 5.0))
+_DEFAULT_MAX_CONCURRENCY = int(os.getenv("LINGUA_MAX_CONCURRENCY", 10))
+_LATENCY_TOLERANCE = 1.5  # latency above baseline * tolerance counts as congestion
+_BASELINE_DECAY = 0.01  # how fast the latency baseline drifts up after a shift
+_EWMA_WEIGHT = 0.2  # weight of the newest sample in the smoothed latency
+_MAX_POLL_INTERVAL = 0.05
+_RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Return the number of seconds a Retry-After header asks us to wait."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateController:
+    """AIMD concurrency window combined with a token-bucket rate ceiling."""
+
+    def __init__(
+        self,
+        max_rps=_DEFAULT_MAX_RPS,
+        max_concurrency=_DEFAULT_MAX_CONCURRENCY,
+        min_concurrency=1,
+        initial_concurrency=2,
+        burst=None,
+    ):
+        self.max_rps = max_rps
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(min(max(initial_concurrency, min_concurrency), max_concurrency))
+        self.burst = burst if burst is not None else max(1.0, max_rps)
+        self.in_flight = 0
+        self.decreases = {}  # what triggered each halving of the window: a status, "error" or "latency"
+
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._latency_baseline = None
+        self._latency_ewma = None
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    # ---------- admission ----------
+
+    def _try_acquire(self):
+        """Take a slot if possible, otherwise return how long to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.max_rps)
+            self._last_refill = now
+
+            if self.in_flight >= int(self.limit):
+                return _MAX_POLL_INTERVAL
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.max_rps
+
+            self._tokens -= 1
+            self.in_flight += 1
+            return 0.0
+
+    async def acquire(self):
+        while True:
+            wait = self._try_acquire()
+            if wait == 0.0:
+                return
+            await asyncio.sleep(min(wait, _MAX_POLL_INTERVAL))
+
+    def acquire_sync(self):
+        while True:
+            wait = self._try_acquire()
+            if wait == 0.0:
+                return
+            time.sleep(min(wait, _MAX_POLL_INTERVAL))
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    # ---------- feedback ----------
+
+    def record(self, latency, status=None, retry_after=None, error=False):
+        """Feed back the outcome of one request and adjust the window."""
+        with self._lock:
+            now = time.monotonic()
+            delay = parse_retry_after(retry_after)
+            if delay:
+                self._paused_until = max(self._paused_until, now + delay)
+                logger.warning(f"⏸️ Server asked to retry after {delay:.1f}s, pausing requests")
+
+            congested = error or status in _RETRYABLE_STATUSES
+            if not congested and latency is not None:
+                if self._latency_baseline is None:
+                    self._latency_baseline = self._latency_ewma = latency
+                self._latency_ewma += (latency - self._latency_ewma) * _EWMA_WEIGHT
+                if latency < self._latency_baseline:
+                    self._latency_baseline = latency
+                else:
+                    self._latency_baseline += (latency - self._latency_baseline) * _BASELINE_DECAY
+                congested = self._latency_ewma > self._latency_baseline * _LATENCY_TOLERANCE
+
+            if congested:
+                # Decrease at most once per round trip so a burst of failures
+                # from the same window does not collapse the limit to the floor.
+                round_trip = self._latency_baseline or 0.0
+                if now - self._last_decrease >= round_trip:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self._last_decrease = now
+                    cause = status if status in _RETRYABLE_STATUSES else "error" if error else "latency"
+                    self.decreases[cause] = self.decreases.get(cause, 0) + 1
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+    # ---------- context managers ----------
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one request slot for the duration of the block. Yields a `RequestOutcome`
+        the caller fills in; exceptions are recorded as errors.
+        """
+        await self.acquire()
+        outcome = RequestOutcome()
+        start = time.perf_counter()
+        try:
+            yield outcome
+        except Exception:
+            outcome.error = True
+            raise
+        finally:
+            self.release()
+            self.record(time.perf_counter() - start, outcome.status, outcome.retry_after, outcome.error)
+
+    @contextmanager
+    def sync_slot(self):
+        """Blocking counterpart of `slot` for the sync Playwright API."""
+        self.acquire_sync()
+        outcome = RequestOutcome()
+        start = time.perf_counter()
+        try:
+            yield outcome
+        except Exception:
+            outcome.error = True
+            raise
+        finally:
+            self.release()
+            self.record(time.perf_counter() - start, outcome.status, outcome.retry_after, outcome.error)
+
+
+class RequestOutcome:
+    """What happened to a request, filled in by the caller inside a slot."""
+
+    def __init__(self):
+        self.status = None
+        self.retry_after = None
+        self.error = False
+
+    def update_from_response(self, response):
+        """Copy status and Retry-After from a Playwright response (which may be None)."""
+        if response is None:
+            return
+        self.status = response.status
+        self.retry_after = response.headers.get("retry-after")
+
+    @property
+    def should_retry(self):
+        return self.status in _RETRYABLE_STATUSES
+
+
+_CONTROLLERS = {}
+_CONTROLLERS_LOCK = threading.Lock()
+
+
+def controller_for(url):
+    """Return the shared controller for the host of `url`."""
+    host = urlparse(url).netloc
+    with _CONTROLLERS_LOCK:
+        if host not in _CONTROLLERS:
+            _CONTROLLERS[host] = RateController()
+        return _CONTROLLERS[host]
+
+
+def configure_host(url, **kwargs):
+    """Replace the shared controller for the host of `url` with one built from `kwargs` (e.g. max_rps)."""
+    host = urlparse(url).netloc
+    with _CONTROLLERS_LOCK:
+        _CONTROLLERS[host] = RateController(**kwargs)
+        return _CONTROLLERS[host]
+
+
+async def goto(page, url, max_retries=3, **kwargs):
+    """
+    Navigate `page` to `url` under the host's rate controller, retrying on
+    throttling and server errors. Returns the final Playwright response;
+    navigation timeouts are counted and re-raised.
+    """
+    controller = controller_for(url)
+    for attempt in range(max_retries + 1):
+        async with controller.slot() as outcome:
+            try:
+                with metrics.FETCH_SECONDS.time():
+                    response = await page.goto(url, **kwargs)
+            except PlaywrightTimeoutError:
+                metrics.TIMEOUTS.inc()
+                raise
+            outcome.update_from_response(response)
+        if not outcome.should_retry or attempt == max_retries:
+            return response
+        metrics.RETRIES.inc()
+        logger.warning(f"🔁 Got {outcome.status} for {url}, retrying ({attempt + 1}/{max_retries})")
+
+
+def goto_sync(page, url, max_retries=3, **kwargs):
+    """Sync Playwright counterpart of `goto`."""
+    controller = controller_for(url)
+    for attempt in range(max_retries + 1):
+        with controller.sync_slot() as outcome:
+            try:
+                with metrics.FETCH_SECONDS.time():
+                    response = page.goto(url, **kwargs)
+            except PlaywrightTimeoutError:  # the sync API raises the same class
+                metrics.TIMEOUTS.inc()
+                raise
+            outcome.update_from_response(response)
+        if not outcome.should_retry or attempt == max_retries:
+            return response
+        metrics.RETRIES.inc()
+        logger.warning(f"🔁 Got {outcome.status} for {url}, retrying ({attempt + 1}/{max_retries})")
@@ -0,0 +1,75 @@
+"""
+Loads the Samam glossary (``data/raw/samam/glossary_df.csv``, tab separated,
+one column per language) into glossary_entry/glossary_term.
+
+The file is read as a stream and sent to the database in batches (COPY on
+PostgreSQL), so memory stays flat whatever its size. Each cell is split into
+word and meaning the way ``preprocess.ipynb`` does it.
+"""
+from itertools import count
+import pathlib
+import csv
+import re
+
+from lingua.data import glossary_loader
+
+_GLOSSARY_FILE = pathlib.Path("data/raw/samam/glossary_df.csv")
+_SOURCE = "samam"
+_LANGUAGES = {"Malayalam": "ml", "Kannada": "kn", "Tamil": "ta", "Telugu": "te"}
+_NUMBERED_SENSE = re.compile(r"\s*\(\d+\)\s*")
+_SENSE_MARKER = re.compile(r"\(\d+\)")
+
+
+def split_glossary_term(text):
+    """
+    (word, meaning) of a glossary cell: split on the first '-', or else on the
+    first "(n)" sense marker; remaining "(n)" markers are dropped. meaning is
+    None when the cell has none.
+    """
+    if "-" in text:
+        word, meaning = text.split("-", 1)
+    else:
+        parts = _NUMBERED_SENSE.split(text, maxsplit=1)
+        word, meaning = parts if len(parts) == 2 else (text, "")
+    word = _SENSE_MARKER.sub("", word).strip()
+    meaning = _SENSE_MARKER.sub("", meaning).strip()
+    return word, meaning or None
+
+
+def iter_glossary_rows(path=_GLOSSARY_FILE):
+    """Yield (row_number, terms) for each row of the glossary file, one term per language cell."""
+    with glossary_loader.open_glossary_file(path) as f:
+        reader = csv.reader(f, delimiter="\t")
+        header = next(reader, [])
+        languages = [(i, _LANGUAGES[name]) for i, name in enumerate(header) if name in _LANGUAGES]
+        if not languages:
+            raise ValueError(f"{path} has none of the columns {', '.join(_LANGUAGES)}")
+
+        for row_number, row in zip(count(1), reader):
+            terms = []
+            for i, language in languages:
+                raw_text = row[i].strip() if i < len(row) else ""
+                if not raw_text:
+                    continue
+                word, meaning = split_glossary_term(raw_text)
+                if word:
+                    terms.append((language, raw_text, word, meaning))
+            yield row_number, terms
+
+
+def iter_glossary_batches(path=_GLOSSARY_FILE, source=_SOURCE, batch_size=glossary_loader.DEFAULT_BATCH_SIZE):
+    """Yield (entry_rows, term_rows) batches of column dicts from the glossary file."""
+    return glossary_loader.iter_batches(iter_glossary_rows(path), source, batch_size)
+
+
+def load_glossary(path=_GLOSSARY_FILE, source=_SOURCE, batch_size=glossary_loader.DEFAULT_BATCH_SIZE):
+    """Replace the `source` glossary in the database with the contents of `path`."""
+    return glossary_loader.load(source, iter_glossary_batches(path, source, batch_size))
+
+
+def main():
+    glossary_loader.main("Load the Samam glossary into the database", iter_glossary_batches, _GLOSSARY_FILE, _SOURCE)
+
+
+if __name__ == "__main__":
+    main()
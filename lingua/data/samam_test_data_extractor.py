@@ -4,6 +4,7 @@ from urllib.parse import urljoin
 import pandas as pd
 from tqdm import tqdm
 import pathlib
+from lingua.data import metrics, rate_control
 
 _BASE_URL = "https://samam.net/glossary/"
 _TOTAL_PAGES = 493
@@ -13,23 +14,28 @@ async def scrape_glossary(browser, url):
     data = []
 
     page = await browser.new_page()
-    await page.goto(url)
-    await page.wait_for_selector('#entries-table')  # XPath not needed
+    await rate_control.goto(page, url)
+    with metrics.WAIT_SECONDS.time():
+        await page.wait_for_selector('#entries-table')  # XPath not needed
+    metrics.PAGES.inc()
 
-    rows = page.locator('table#entries-table tr')
-    count = await rows.count()
+    with metrics.PARSE_SECONDS.time():
+        rows = page.locator('table#entries-table tr')
+        count = await rows.count()
 
-    for i in range(1, count):  # skip header
-        row_text = await rows.nth(i).inner_text()
-        columns = row_text.split('\t')
-        if len(columns) == 4:
-            data.append([col.strip() for col in columns])
+        for i in range(1, count):  # skip header
+            row_text = await rows.nth(i).inner_text()
+            columns = row_text.split('\t')
+            if len(columns) == 4:
+                data.append([col.strip() for col in columns])
 
     await page.close()
+    metrics.DEFINITIONS.inc(len(data))
 
     return pd.DataFrame(data, columns=["Malayalam", "Kannada", "Tamil", "Telugu"])
 
 async def main():
+    metrics.setup_metrics("samam_test_data_extractor")
     glossary_df = pd.DataFrame()
     async with async_playwright() as playwright:
         browser = await playwright.chromium.launch(headless=True)
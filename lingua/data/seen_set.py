@@ -0,0 +1,260 @@
+"""
+Persistent set of URLs already saved, shared across alphabets and runs.
+
+URLs are stored as 64-bit fingerprints (blake2b), so the set costs 8 bytes per
+URL on disk no matter how long the URL is. The file is::
+
+    header   magic b"LNGSEEN1", number of sorted fingerprints n
+    sorted   n fingerprints, ascending, uint64 little-endian
+    tail     fingerprints appended since the last compaction, unsorted
+
+The sorted part is memory-mapped and binary-searched, so opening the set does
+not read it; only the tail (bounded by `compact_every`) is loaded. When the
+tail is full it is merged into the sorted part and the file is swapped
+atomically; the merge runs in numpy, one chunk of the sorted part at a time.
+
+An optional Bloom filter sidecar (``<path>.bloom``, also memory-mapped) answers
+most lookups of new URLs without touching the sorted part.
+"""
+from array import array
+import numpy as np
+import threading
+import hashlib
+import bisect
+import struct
+import mmap
+import math
+import os
+
+_MAGIC = b"LNGSEEN1"
+_HEADER = struct.Struct("<8sQ")
+_BLOOM_MAGIC = b"LNGBLOM1"
+_BLOOM_HEADER = struct.Struct("<8sQQQ")  # magic, bits, hashes, fingerprints covered
+_FINGERPRINT_SIZE = 8
+_DEFAULT_COMPACT_EVERY = 1 << 18
+_DEFAULT_BLOOM_CAPACITY = 10_000_000
+_DEFAULT_BLOOM_ERROR_RATE = 0.01
+_MERGE_CHUNK = 1 << 20  # fingerprints of the sorted part merged per step, 8 MB
+
+
+def fingerprint(url):
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=_FINGERPRINT_SIZE).digest(), "little")
+
+
+class BloomFilter:
+    """Memory-mapped Bloom filter over 64-bit fingerprints (which are already uniformly hashed)."""
+
+    def __init__(self, path, capacity=_DEFAULT_BLOOM_CAPACITY, error_rate=_DEFAULT_BLOOM_ERROR_RATE):
+        self.path = path
+        if not os.path.exists(path):
+            bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+            hashes = max(1, round(bits / capacity * math.log(2)))
+            with open(path, "wb") as f:
+                f.write(_BLOOM_HEADER.pack(_BLOOM_MAGIC, bits, hashes, 0))
+                f.truncate(_BLOOM_HEADER.size + (bits + 7) // 8)
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.bits, self.hashes, self.count = _BLOOM_HEADER.unpack_from(self._map, 0)
+        if magic != _BLOOM_MAGIC:
+            raise ValueError(f"{path} is not a Bloom filter")
+        self.capacity = int(self.bits * math.log(2) ** 2 / -math.log(error_rate))
+
+    def _positions(self, fp):
+        h1, h2 = fp & 0xFFFFFFFF, (fp >> 32) | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, fp):
+        for bit in self._positions(fp):
+            self._map[_BLOOM_HEADER.size + (bit >> 3)] |= 1 << (bit & 7)
+
+    def add_many(self, fps):
+        """Vectorized `add` of a numpy array of fingerprints."""
+        bits = np.frombuffer(self._map, dtype=np.uint8, offset=_BLOOM_HEADER.size)
+        h1, h2 = fps & np.uint64(0xFFFFFFFF), (fps >> np.uint64(32)) | np.uint64(1)
+        for i in range(self.hashes):
+            positions = (h1 + np.uint64(i) * h2) % np.uint64(self.bits)
+            np.bitwise_or.at(bits, positions >> np.uint64(3), (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)))
+        del bits
+
+    def __contains__(self, fp):
+        return all(self._map[_BLOOM_HEADER.size + (bit >> 3)] & (1 << (bit & 7)) for bit in self._positions(fp))
+
+    def set_count(self, count):
+        self.count = count
+        _BLOOM_HEADER.pack_into(self._map, 0, _BLOOM_MAGIC, self.bits, self.hashes, count)
+
+    def close(self):
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+class SeenSet:
+    """Thread-safe persistent set of URL fingerprints; see the module docstring for the layout."""
+
+    def __init__(self, path, compact_every=_DEFAULT_COMPACT_EVERY, bloom=True,
+                 bloom_capacity=_DEFAULT_BLOOM_CAPACITY, bloom_error_rate=_DEFAULT_BLOOM_ERROR_RATE):
+        self.path = path
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, 0))
+        self._open()
+
+        self._bloom = None
+        if bloom:
+            bloom_path = f"{path}.bloom"
+            self._bloom = BloomFilter(bloom_path, max(bloom_capacity, 2 * len(self)), bloom_error_rate)
+            if self._bloom.count != len(self):
+                # Out of step with the set (e.g. the set file was replaced): start it over
+                self._bloom.close()
+                os.remove(bloom_path)
+                self._bloom = BloomFilter(bloom_path, max(bloom_capacity, 2 * len(self)), bloom_error_rate)
+                self._rebuild_bloom()
+
+    def _open(self):
+        self._file = open(self.path, "r+b")
+        magic, self._n_sorted = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} is not a seen-URL set")
+        sorted_end = _HEADER.size + self._n_sorted * _FINGERPRINT_SIZE
+        self._map = mmap.mmap(self._file.fileno(), sorted_end, access=mmap.ACCESS_READ)
+        self._sorted = memoryview(self._map)[_HEADER.size:].cast("Q")
+
+        self._file.seek(sorted_end)
+        tail_bytes = self._file.read()
+        # Drop a fingerprint left half-written by an interrupted append
+        usable = len(tail_bytes) - len(tail_bytes) % _FINGERPRINT_SIZE
+        if usable != len(tail_bytes):
+            self._file.truncate(sorted_end + usable)
+        tail = array("Q")
+        tail.frombytes(tail_bytes[:usable])
+        self._tail = set(tail)
+        self._file.seek(0, os.SEEK_END)
+
+    def _sorted_array(self):
+        return np.frombuffer(self._map, dtype="<u8", count=self._n_sorted, offset=_HEADER.size)
+
+    def _close_map(self):
+        self._sorted.release()
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return self._n_sorted + len(self._tail)
+
+    def _contains_fp(self, fp):
+        if self._bloom is not None and fp not in self._bloom:
+            return False
+        if fp in self._tail:
+            return True
+        i = bisect.bisect_left(self._sorted, fp)
+        return i < self._n_sorted and self._sorted[i] == fp
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._contains_fp(fingerprint(url))
+
+    def filter_new(self, urls):
+        """The URLs of `urls` not in the set, in order and without duplicates."""
+        new, batch = [], set()
+        with self._lock:
+            for url in urls:
+                fp = fingerprint(url)
+                if fp not in batch and not self._contains_fp(fp):
+                    batch.add(fp)
+                    new.append(url)
+        return new
+
+    def add_many(self, urls):
+        """Add `urls` with a single append; returns how many were new."""
+        with self._lock:
+            new, batch = array("Q"), set()
+            for url in urls:
+                fp = fingerprint(url)
+                if fp not in batch and not self._contains_fp(fp):
+                    batch.add(fp)
+                    new.append(fp)
+                    self._tail.add(fp)
+                    if self._bloom is not None:
+                        self._bloom.add(fp)
+            if new:
+                self._file.write(new.tobytes())
+                self._file.flush()
+                if self._bloom is not None:
+                    self._bloom.set_count(len(self))
+                if len(self._tail) >= self.compact_every:
+                    self._compact()
+            return len(new)
+
+    def add(self, url):
+        return self.add_many([url]) == 1
+
+    def _compact(self):
+        """Merge the tail into the sorted part and swap the file in atomically."""
+        tmp_path = f"{self.path}.tmp"
+        n = len(self)
+        existing = self._sorted_array()
+        tail = np.sort(np.fromiter(self._tail, dtype="<u8", count=len(self._tail)))
+        # Where each tail fingerprint goes in the sorted part; ascending because the tail is sorted
+        positions = np.searchsorted(existing, tail)
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, n))
+            inserted = 0
+            for start in range(0, self._n_sorted, _MERGE_CHUNK):
+                stop = min(start + _MERGE_CHUNK, self._n_sorted)
+                upto = int(np.searchsorted(positions, stop))
+                chunk = np.insert(existing[start:stop], positions[inserted:upto] - start, tail[inserted:upto])
+                f.write(chunk.tobytes())
+                inserted = upto
+            f.write(tail[inserted:].tobytes())
+        del existing  # release the export so the map can close
+        self._close_map()
+        os.replace(tmp_path, self.path)
+        self._open()
+
+        if self._bloom is not None and n > self._bloom.capacity:
+            # Keep the false-positive rate: grow the filter to twice the current size
+            self._bloom.close()
+            os.remove(self._bloom.path)
+            self._bloom = BloomFilter(self._bloom.path, 2 * n)
+            self._rebuild_bloom()
+
+    def _rebuild_bloom(self):
+        existing = self._sorted_array()
+        for start in range(0, self._n_sorted, _MERGE_CHUNK):
+            self._bloom.add_many(existing[start:start + _MERGE_CHUNK])
+        del existing
+        self._bloom.add_many(np.fromiter(self._tail, dtype="<u8", count=len(self._tail)))
+        self._bloom.set_count(len(self))
+
+    def clear(self):
+        """Forget every URL, e.g. after the words they were saved as have been deleted."""
+        with self._lock:
+            self._close_map()
+            with open(self.path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, 0))
+            self._open()
+            if self._bloom is not None:
+                bloom_path, capacity = self._bloom.path, self._bloom.capacity
+                self._bloom.close()
+                os.remove(bloom_path)
+                self._bloom = BloomFilter(bloom_path, capacity)
+
+    def compact(self):
+        with self._lock:
+            if self._tail:
+                self._compact()
+
+    def close(self):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.close()
+            self._close_map()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
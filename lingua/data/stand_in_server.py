@@ -0,0 +1,453 @@
+"""
+Local stand-in for ml.wiktionary.org used to exercise the crawlers offline.
+
+The server models a host with limited capacity: every response is delayed by
+a base latency plus a queueing penalty for each request in flight beyond
+`capacity`, requests far beyond capacity are throttled with a 429 and a
+``Retry-After`` header, and a configurable share of requests fail with a 503.
+
+`StandInCrawlWiki` additionally serves a browsable synthetic wiki (alphabet
+index, paginated prefix listings and word pages) for end-to-end crawls.
+
+Run ``python -m lingua.data.stand_in_server`` to simulate a crawl through the
+shared `RateController` against a stand-in that throttles and fails: it prints
+how the concurrency window evolves and exits non-zero unless the rate ceiling
+held, the window shrank on 429s and 503s and Retry-After pauses were honoured.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs, quote, unquote
+from xml.sax.saxutils import escape
+import urllib.request
+import urllib.error
+import threading
+import bisect
+import json
+import argparse
+import logging
+import random
+import time
+import sys
+
+from lingua.data.rate_control import RateController
+from lingua.data.synthetic_wiki import page_html
+
+logger = logging.getLogger(__name__)
+
+
+class StandInWiki:
+    """Behaviour of the stand-in host, shared by all request handler threads."""
+
+    def __init__(self, base_latency=0.05, capacity=4, throttle_factor=2.0, error_rate=0.0, retry_after=1, seed=0):
+        self.base_latency = base_latency
+        self.capacity = capacity
+        self.throttle_factor = throttle_factor
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.arrivals = []  # (monotonic time, status) of every request
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def enter(self):
+        """Register an incoming request and decide how to answer it: (status, delay)."""
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+            if self.in_flight > self.capacity * self.throttle_factor:
+                self.throttled += 1
+                status, delay = 429, 0.0
+            elif self._random.random() < self.error_rate:
+                status, delay = 503, self.base_latency
+            else:
+                status, delay = 200, self.base_latency * (1 + max(0, self.in_flight - self.capacity))
+            self.arrivals.append((time.monotonic(), status))
+            return status, delay
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def render(self, path):
+        """Body served for a successful request. Extended by richer stand-ins."""
+        return f"<html><body><div id=\"mw-content-text\">{path}</div></body></html>"
+
+
+class StandInApiWiki(StandInWiki):
+    """
+    Stand-in that also answers canned MediaWiki API queries from a fixed title
+    list: ``list=allpages`` (prefix/from/to, sorted, with ``apcontinue``) and
+    ``list=categorymembers`` (with ``cmcontinue``).
+
+    Given `pages` (objects with ``title``, ``rev_id``, ``timestamp`` and
+    ``wikitext``, e.g. `synthetic_wiki.SyntheticPage`), it also serves
+    ``prop=revisions`` and ``list=recentchanges``; `edit` creates new revisions.
+    """
+
+    def __init__(self, titles=(), categories=None, pages=None, max_limit=500, **kwargs):
+        super().__init__(**kwargs)
+        self.pages = {page.title: page for page in pages or ()}
+        if not titles:
+            titles = [page.title for page in self.pages.values() if page.ns == 0 and not page.redirect]
+        self.titles = sorted(titles)
+        self.categories = categories or {}
+        self.max_limit = max_limit
+        self.changes = []
+        self._next_rev_id = max((page.rev_id for page in self.pages.values()), default=0) + 1
+
+    def edit(self, title, wikitext, timestamp):
+        """Save a new revision of `title` and log it in the recent changes."""
+        page = self.pages[title]
+        page.rev_id = self._next_rev_id
+        self._next_rev_id += 1
+        page.timestamp = timestamp
+        page.edited_wikitext = wikitext
+        self.changes.append({"type": "edit", "ns": 0, "title": title, "revid": page.rev_id, "timestamp": timestamp})
+        return page.rev_id
+
+    def _wikitext(self, page):
+        return getattr(page, "edited_wikitext", None) or page.wikitext
+
+    def _limit(self, value):
+        if value in (None, "max"):
+            return self.max_limit
+        return min(int(value), self.max_limit)
+
+    def _allpages(self, params):
+        prefix = params.get("apprefix", "")
+        start = params.get("apcontinue") or params.get("apfrom") or prefix
+        stop = params.get("apto")
+        limit = self._limit(params.get("aplimit"))
+
+        matches = []
+        index = bisect.bisect_left(self.titles, start)
+        while index < len(self.titles) and len(matches) <= limit:
+            title = self.titles[index]
+            if not title.startswith(prefix) or (stop is not None and title > stop):
+                break
+            matches.append(title)
+            index += 1
+
+        payload = {"batchcomplete": True, "query": {"allpages": [{"ns": 0, "title": t} for t in matches[:limit]]}}
+        if len(matches) > limit:
+            payload["continue"] = {"apcontinue": matches[limit], "continue": "-||"}
+        return payload
+
+    def _categorymembers(self, params):
+        members = self.categories.get(params.get("cmtitle"), [])
+        offset = int(params.get("cmcontinue", 0))
+        limit = self._limit(params.get("cmlimit"))
+        batch = members[offset:offset + limit]
+
+        payload = {"batchcomplete": True, "query": {"categorymembers": [{"ns": 0, "title": t} for t in batch]}}
+        if offset + limit < len(members):
+            payload["continue"] = {"cmcontinue": str(offset + limit), "continue": "-||"}
+        return payload
+
+    def _revisions(self, params):
+        with_content = "content" in params.get("rvprop", "").split("|")
+        results = []
+        for title in params.get("titles", "").split("|"):
+            page = self.pages.get(title)
+            if page is None:
+                results.append({"ns": 0, "title": title, "missing": True})
+                continue
+            revision = {"revid": page.rev_id, "timestamp": page.timestamp}
+            if with_content:
+                revision["slots"] = {"main": {"contentmodel": "wikitext", "content": self._wikitext(page)}}
+            results.append({"pageid": page.page_id, "ns": page.ns, "title": title, "revisions": [revision]})
+        return {"batchcomplete": True, "query": {"pages": results}}
+
+    def _recentchanges(self, params):
+        start = params.get("rcstart", "")
+        changes = [c for c in sorted(self.changes, key=lambda c: c["timestamp"]) if c["timestamp"] >= start]
+        offset = int(params.get("rccontinue", 0))
+        limit = self._limit(params.get("rclimit"))
+
+        payload = {"batchcomplete": True, "query": {"recentchanges": changes[offset:offset + limit]}}
+        if offset + limit < len(changes):
+            payload["continue"] = {"rccontinue": str(offset + limit), "continue": "-||"}
+        return payload
+
+    def api(self, params):
+        """Answer one API call, or None if the call is not supported."""
+        if params.get("action") != "query":
+            return None
+        if params.get("list") == "allpages":
+            return self._allpages(params)
+        if params.get("list") == "categorymembers":
+            return self._categorymembers(params)
+        if params.get("list") == "recentchanges":
+            return self._recentchanges(params)
+        if params.get("prop") == "revisions":
+            return self._revisions(params)
+        return None
+
+    def render(self, path):
+        parts = urlsplit(path)
+        if parts.path != "/w/api.php":
+            return super().render(path)
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        payload = self.api(params)
+        if payload is None:
+            payload = {"error": {"code": "badvalue", "info": f"Unsupported call: {params}"}}
+        return json.dumps(payload, ensure_ascii=False), "application/json; charset=utf-8"
+
+
+class StandInCrawlWiki(StandInApiWiki):
+    """
+    Stand-in that renders the pages the browser scrapers walk, from `pages`
+    (`synthetic_wiki.SyntheticPage` objects):
+
+    - ``/wiki/index``: the alphabet index (``#mwCA`` with the links in ``#mwBw``)
+    - ``/wiki/Special:PrefixIndex/<alphabet>?from=<title>``: `listing_page_size`
+      titles per page. Pages with a successor lay out ``#mw-content-text`` as
+      intro, nav, list, nav (links in ``div[3]``, next link in ``div[4]``); the
+      last page as intro, list (links in ``div[2]``).
+    - ``/wiki/<title>``: the rendered word page
+
+    Links are absolute, so `base_url` must be set once the server is listening.
+    """
+
+    INDEX_PATH = "/wiki/index"
+    _LISTING_PATH = "/wiki/Special:PrefixIndex/"
+
+    def __init__(self, pages, listing_page_size=200, base_url="", **kwargs):
+        super().__init__(pages=pages, **kwargs)
+        self.listing_page_size = listing_page_size
+        self.base_url = base_url
+        self.listings = {}
+        for title in self.titles:
+            self.listings.setdefault(title[0], []).append(title)
+
+    def _url(self, path):
+        return f"{self.base_url}{quote(path, safe='/:?=&')}"
+
+    @staticmethod
+    def _document(title, content):
+        return (
+            "<!DOCTYPE html><html lang=\"ml\"><head><meta charset=\"UTF-8\">"
+            f"<title>{escape(title)}</title></head><body>{content}</body></html>"
+        )
+
+    def _index(self):
+        # Unencoded, like the live index: url_scrapper takes the alphabet from the last URL segment
+        links = "".join(
+            f'<li><a href="{self.base_url}{self._LISTING_PATH}{alphabet}">{alphabet}</a></li>' for alphabet in self.listings
+        )
+        return self._document("ഉള്ളടക്കം", f'<section id="mwCA"><div id="mwBw"><ul>{links}</ul></div></section>')
+
+    def _listing(self, alphabet, start):
+        titles = self.listings.get(alphabet)
+        if titles is None:
+            return None
+        index = bisect.bisect_left(titles, start) if start else 0
+        batch = titles[index:index + self.listing_page_size]
+        following = titles[index + self.listing_page_size:index + self.listing_page_size + 1]
+
+        intro = f"<div><p>{escape(alphabet)} എന്നു തുടങ്ങുന്ന താളുകൾ</p></div>"
+        items = "".join(f'<li><a href="{self._url("/wiki/" + t)}" title="{escape(t)}">{escape(t)}</a></li>' for t in batch)
+        listing = f'<div class="mw-prefixindex-body"><ul class="mw-prefixindex-list">{items}</ul></div>'
+        if following:
+            next_url = self._url(f"{self._LISTING_PATH}{alphabet}?from={following[0]}")
+            nav = f'<div class="mw-prefixindex-nav"><a href="{escape(next_url)}">അടുത്ത താൾ ({escape(following[0])})</a></div>'
+            content = intro + nav + listing + nav
+        else:
+            content = intro + listing
+        return self._document(f"Special:PrefixIndex/{alphabet}", f'<div id="mw-content-text">{content}</div>')
+
+    def render(self, path):
+        parts = urlsplit(path)
+        page_path = unquote(parts.path)
+        if parts.path == "/w/api.php":
+            return super().render(path)
+        if page_path == self.INDEX_PATH:
+            return self._index()
+        if page_path.startswith(self._LISTING_PATH):
+            start = parse_qs(parts.query).get("from", [None])[-1]
+            return self._listing(page_path[len(self._LISTING_PATH):], start)
+        page = self.pages.get(page_path[len("/wiki/"):].replace("_", " "))
+        if page is None or page.ns != 0 or page.redirect:
+            return None
+        return page_html(page)
+
+
+def make_handler(wiki):
+    class _StandInHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, delay = wiki.enter()
+            try:
+                time.sleep(delay)
+                if status == 429:
+                    self.send_response(429)
+                    self.send_header("Retry-After", str(wiki.retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if status != 200:
+                    self.send_error(status)
+                    return
+                body, content_type = wiki.render(self.path), "text/html; charset=utf-8"
+                if isinstance(body, tuple):
+                    body, content_type = body
+                if body is None:
+                    self.send_error(404)
+                    return
+                body = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                wiki.leave()
+
+        def log_message(self, format, *args):
+            pass
+
+    return _StandInHandler
+
+
+def start_server(wiki, host="127.0.0.1", port=0):
+    """Start the stand-in on a daemon thread. Returns the server; its URL is `server_url(server)`."""
+    server = ThreadingHTTPServer((host, port), make_handler(wiki))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def server_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def simulate_crawl(base_url, controller, total_requests=300, workers=32):
+    """
+    Drive `total_requests` GETs through `controller` from a pool of `workers`
+    threads, retrying throttled requests. Returns the sampled trajectory of the
+    concurrency window and the achieved throughput.
+    """
+    trajectory = []
+    statuses = {}
+    statuses_lock = threading.Lock()
+
+    def fetch(i):
+        url = f"{base_url}/wiki/word_{i}"
+        while True:
+            with controller.sync_slot() as outcome:
+                try:
+                    with urllib.request.urlopen(url) as response:
+                        response.read()
+                        outcome.status = response.status
+                except urllib.error.HTTPError as e:
+                    outcome.status = e.code
+                    outcome.retry_after = e.headers.get("Retry-After")
+            with statuses_lock:
+                statuses[outcome.status] = statuses.get(outcome.status, 0) + 1
+                trajectory.append(round(controller.limit, 2))
+            if not outcome.should_retry:
+                return
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fetch, range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests_per_second": round(total_requests / elapsed, 2),
+        "elapsed_seconds": round(elapsed, 2),
+        "statuses": statuses,
+        "final_limit": round(controller.limit, 2),
+        "peak_limit": max(trajectory),
+        "trajectory": trajectory[:: max(1, len(trajectory) // 20)],
+    }
+
+
+def check_crawl(wiki, controller, retry_after_grace=0.1, burst_slack=2):
+    """
+    Check a finished `simulate_crawl` against what the controller promises and
+    return the failures (an empty list when all hold):
+
+    - the server never saw more requests in any interval than the token bucket
+      admits (``burst + max_rps * seconds``, give or take `burst_slack`),
+    - 429s and 503s each halved the concurrency window at least once,
+    - no request reached the server while a ``Retry-After`` pause was running,
+      apart from ones already admitted within `retry_after_grace` seconds.
+    """
+    failures = []
+    arrivals = sorted(wiki.arrivals)
+    statuses = [status for _, status in arrivals]
+
+    # Largest count of arrivals in excess of the rate over any interval: max of a_j - min a_i, a_k = k - rate * t_k
+    peak, lowest = 0.0, float("inf")
+    for k, (t, _) in enumerate(arrivals):
+        lowest = min(lowest, k - controller.max_rps * t)
+        peak = max(peak, k - controller.max_rps * t - lowest + 1)
+    if peak > controller.burst + burst_slack:
+        failures.append(f"rate ceiling exceeded: a burst of {peak:.1f} requests above {controller.max_rps}/s (bucket {controller.burst})")
+
+    for status in (429, 503):
+        if status not in statuses:
+            failures.append(f"the stand-in never answered {status}; nothing to check the controller against")
+        elif not controller.decreases.get(status):
+            failures.append(f"the window never shrank after a {status}")
+
+    times = [t for t, _ in arrivals]
+    for throttled_at in (t for t, status in arrivals if status == 429):
+        quiet_from = throttled_at + retry_after_grace
+        quiet_until = throttled_at + wiki.retry_after - retry_after_grace
+        inside = bisect.bisect_left(times, quiet_until) - bisect.bisect_right(times, quiet_from)
+        if inside > 0:
+            failures.append(f"{inside} requests arrived during the Retry-After pause starting at {throttled_at:.2f}")
+            break
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simulate a crawl against a local stand-in wiki and check the rate controller's guarantees."
+    )
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--capacity", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--max-rps", type=float, default=50.0)
+    parser.add_argument("--burst", type=float, default=10.0)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--initial-concurrency", type=int, default=12,
+                        help="start above the stand-in's throttling threshold so it answers 429s")
+    args = parser.parse_args()
+
+    wiki = StandInWiki(
+        base_latency=args.latency, capacity=args.capacity, error_rate=args.error_rate, retry_after=args.retry_after
+    )
+    server = start_server(wiki)
+    controller = RateController(
+        max_rps=args.max_rps, max_concurrency=args.max_concurrency,
+        initial_concurrency=args.initial_concurrency, burst=args.burst,
+    )
+    try:
+        result = simulate_crawl(server_url(server), controller, total_requests=args.requests)
+    finally:
+        server.shutdown()
+
+    result["server_throttled"] = wiki.throttled
+    result["window_decreases"] = controller.decreases
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+    failures = check_crawl(wiki, controller)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("PASS: rate ceiling held, the window shrank on 429 and 503, Retry-After pauses were respected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Deterministic synthetic Malayalam Wiktionary content for offline runs.
+
+Generates word titles per alphabet with their definitions, the wikitext of
+their pages, and ``pages-articles`` style XML dumps (single or multistream
+bz2) built from them.
+"""
+from xml.sax.saxutils import escape
+from urllib.parse import quote
+import random
+import bz2
+
+_ALPHABETS = "അആഇഈഉഊഋഎഏഐഒഓഔകഖഗഘങചഛജഝഞടഠഡഢണതഥദധനപഫബഭമയരലവശഷസഹളഴറ"
+_SYLLABLES = [c + s for c in "കഗചജടതദനപബമയരലവസ" for s in ("", "ാ", "ി", "ു", "െ", "്")]
+_XML_NAMESPACE = "http://www.mediawiki.org/xml/export-0.11/"
+_PAGES_PER_STREAM = 100
+# Navigation boilerplate so synthetic pages weigh about as much as real ones
+_NAV_MENU = "".join(f"<li><a href='/wiki/Nav_{j}'>നാവിഗേഷൻ {j}</a></li>" for j in range(20))
+_CHROME = '<div id="mw-navigation">' + f'<div class="vector-menu"><ul>{_NAV_MENU}</ul></div>' * 10 + "</div>"
+
+
+class SyntheticPage:
+    """One synthetic page as it would appear in a dump."""
+
+    def __init__(self, page_id, title, definitions, ns=0, redirect=None, rev_id=None, timestamp="2025-01-01T00:00:00Z"):
+        self.page_id = page_id
+        self.title = title
+        self.definitions = definitions
+        self.ns = ns
+        self.redirect = redirect
+        self.rev_id = rev_id if rev_id is not None else page_id * 10
+        self.timestamp = timestamp
+
+    @property
+    def wikitext(self):
+        if self.redirect:
+            return f"#REDIRECT [[{self.redirect}]]"
+        items = "\n".join(f"# [[{d}]]" if i == 0 else f"# {d}" for i, d in enumerate(self.definitions))
+        return f"== മലയാളം ==\n{{{{നാമം}}}}\n'''{self.title}'''\n{items}\n\n[[വർഗ്ഗം:മലയാളം]]\n"
+
+
+def page_html(page):
+    """
+    Rendered HTML of an article page, laid out like ml.wiktionary.org: the parser
+    output is the first div of #mw-content-text, with the bold headword in a
+    paragraph followed by an ordered list of definitions.
+    """
+    items = "".join(
+        f'<li><a href="/wiki/{quote(d.replace(" ", "_"))}" title="{escape(d)}">{escape(d)}</a></li>' if i == 0
+        else f"<li>{escape(d)}</li>"
+        for i, d in enumerate(page.definitions)
+    )
+    return (
+        "<!DOCTYPE html><html lang=\"ml\"><head><meta charset=\"UTF-8\">"
+        f"<title>{escape(page.title)} - വിക്കിനിഘണ്ടു</title></head><body>"
+        f"{_CHROME}"
+        f'<div id="content"><h1 id="firstHeading">{escape(page.title)}</h1>'
+        '<div id="bodyContent"><div id="mw-content-text">'
+        '<div class="mw-content-ltr mw-parser-output" lang="ml" dir="ltr">'
+        '<h2><span class="mw-headline" id="മലയാളം">മലയാളം</span></h2>'
+        f"<p><b>{escape(page.title)}</b></p><ol>{items}</ol>"
+        "</div></div></div></div></body></html>"
+    )
+
+
+def alphabets(n_alphabets):
+    return list(_ALPHABETS[:n_alphabets])
+
+
+def synthetic_word(alphabet, index):
+    """The `index`-th synthetic word of `alphabet`; distinct indexes give distinct words."""
+    suffix = []
+    while True:
+        index, digit = divmod(index, len(_SYLLABLES))
+        suffix.append(_SYLLABLES[digit])
+        if index == 0:
+            return alphabet + "".join(suffix)
+        index -= 1
+
+
+def synthetic_definitions(word, rng):
+    return [f"{word} എന്ന വാക്കിന്റെ അർത്ഥം {k + 1}" for k in range(rng.randint(1, 3))]
+
+
+def synthetic_pages(n_alphabets=5, words_per_alphabet=50, seed=0):
+    """
+    Yield `SyntheticPage` objects: `words_per_alphabet` words for each of the
+    first `n_alphabets` letters, plus a redirect and a non-article page every
+    so often so consumers have to filter them.
+    """
+    rng = random.Random(seed)
+    page_id = 1
+    for alphabet in alphabets(n_alphabets):
+        for i in range(words_per_alphabet):
+            word = synthetic_word(alphabet, i)
+            yield SyntheticPage(page_id, word, synthetic_definitions(word, rng))
+            page_id += 1
+            if i % 25 == 24:
+                yield SyntheticPage(page_id, f"{word} (തിരിച്ചുവിടൽ)", [], redirect=word)
+                page_id += 1
+        yield SyntheticPage(page_id, f"ഫലകം:{alphabet}", [], ns=10)
+        page_id += 1
+
+
+def _page_xml(page):
+    redirect = f'    <redirect title="{escape(page.redirect)}" />\n' if page.redirect else ""
+    return (
+        "  <page>\n"
+        f"    <title>{escape(page.title)}</title>\n"
+        f"    <ns>{page.ns}</ns>\n"
+        f"    <id>{page.page_id}</id>\n"
+        f"{redirect}"
+        "    <revision>\n"
+        f"      <id>{page.rev_id}</id>\n"
+        f"      <timestamp>{page.timestamp}</timestamp>\n"
+        "      <model>wikitext</model>\n"
+        "      <format>text/x-wiki</format>\n"
+        f'      <text xml:space="preserve">{escape(page.wikitext)}</text>\n'
+        "    </revision>\n"
+        "  </page>\n"
+    )
+
+
+def write_dump(path, pages, multistream=True, compresslevel=9):
+    """
+    Write `pages` as a ``pages-articles.xml.bz2`` dump. A multistream dump puts
+    the header, every `_PAGES_PER_STREAM` pages and the footer in separate bz2
+    streams, like the ``-multistream`` files; otherwise the whole dump is one stream.
+    """
+    header = (
+        f'<mediawiki xmlns="{_XML_NAMESPACE}" version="0.11" xml:lang="ml">\n'
+        "  <siteinfo>\n    <sitename>വിക്കിനിഘണ്ടു</sitename>\n    <dbname>mlwiktionary</dbname>\n  </siteinfo>\n"
+    )
+    footer = "</mediawiki>\n"
+
+    if not multistream:
+        with bz2.open(path, "wt", encoding="utf-8", compresslevel=compresslevel) as f:
+            f.write(header)
+            for page in pages:
+                f.write(_page_xml(page))
+            f.write(footer)
+        return path
+
+    with open(path, "wb") as f:
+        f.write(bz2.compress(header.encode("utf-8"), compresslevel))
+        chunk = []
+        for page in pages:
+            chunk.append(_page_xml(page))
+            if len(chunk) == _PAGES_PER_STREAM:
+                f.write(bz2.compress("".join(chunk).encode("utf-8"), compresslevel))
+                chunk = []
+        if chunk:
+            f.write(bz2.compress("".join(chunk).encode("utf-8"), compresslevel))
+        f.write(bz2.compress(footer.encode("utf-8"), compresslevel))
+    return path
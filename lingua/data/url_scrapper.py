@@ -1,10 +1,17 @@
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from parsel import Selector
 from urllib.parse import urljoin
+import argparse
 import asyncio
-from lingua.database.crud import upsert_alphabet, get_all_alphabets, add_word, soft_delete_alphabets
+import hashlib
+import glob
+import os
+from lingua.database.crud import upsert_alphabet, get_all_alphabets, add_words, soft_delete_alphabets, get_word_urls_by_alphabet
+from lingua.database.connection import get_engine
+from lingua.data import metrics, rate_control, wiktionary_api
+from lingua.data.parse_pool import ParsePool
+from lingua.data.seen_set import SeenSet
 from tqdm import tqdm
-import time
 import logging
 
 # Set up logging
@@ -19,159 +26,172 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 _BASE_URL = "https://ml.wiktionary.org"
-MAX_CONCURRENT_BROWSERS = 5
+MAX_CONCURRENT_BROWSERS = 10 # upper bound, request concurrency is adapted by rate_control
 _ALPHABET_RESCRAPPING_LIST = [] # incase scrapping fails for some alphabets
 
 async def scrape_alphabet_url(playwright, website):
     browser = await playwright.chromium.launch(headless=True)
     page = await browser.new_page()
-    await page.goto(website)
-    await page.wait_for_selector('//*[@id="mwCA"]')
+    await rate_control.goto(page, website)
+    with metrics.WAIT_SECONDS.time():
+        await page.wait_for_selector('//*[@id="mwCA"]')
     page_html = await page.content()
     await browser.close()
+    metrics.PAGES.inc()
 
-    sel = Selector(text=page_html)
-    container = sel.xpath('//*[@id="mwBw"]')
-    links = container.xpath('.//a')
+    with metrics.PARSE_SECONDS.time():
+        sel = Selector(text=page_html)
+        container = sel.xpath('//*[@id="mwBw"]')
+        links = container.xpath('.//a')
+        hrefs = [link.xpath('.//@href').get() for link in links]
 
-    for link in tqdm(links):
-        href = link.xpath('.//@href').get()
+    for href in tqdm(hrefs):
         if href:
             absolute_url = urljoin("https:", href)
             alphabet = absolute_url.split("/")[-1]
-            upsert_alphabet(alphabet, absolute_url)
+            with metrics.DB_WRITE_SECONDS.time():
+                upsert_alphabet(alphabet, absolute_url)
+            metrics.LINKS.inc()
 
     logger.info("✅ Saved alphabet URLs to database.")
 
 
 async def wait_for_either(page, selectors, timeout=10000):
-    start = time.time()
-    while True:
-        for sel in selectors:
-            try:
-                el = await page.query_selector(f"xpath={sel}")
-                if el:
-                    return sel  # Return the matched selector
-            except:
-                pass
-
-        if (time.time() - start) * 1000 > timeout:
-            raise PlaywrightTimeoutError(f"Timeout waiting for one of: {selectors}")
-
-        await asyncio.sleep(0.2)  # Short sleep between checks
-
-
-async def process_alphabet(playwright, ml_record, semaphore):
+    # Wait once on the union of the XPaths instead of polling each one
+    try:
+        await page.wait_for_selector(f"xpath={' | '.join(selectors)}", timeout=timeout)
+    except PlaywrightTimeoutError:
+        metrics.TIMEOUTS.inc()
+        raise PlaywrightTimeoutError(f"Timeout waiting for one of: {selectors}")
+
+    for sel in selectors:
+        if await page.query_selector(f"xpath={sel}"):
+            return sel  # Return the first matching selector, in priority order
+
+
+def default_seen_urls_path():
+    """
+    File of the URLs already saved to the configured database: LINGUA_SEEN_URLS,
+    or else one file per database URL, so another database never sees a stale set.
+    """
+    path = os.getenv("LINGUA_SEEN_URLS")
+    if path:
+        return path
+    database = get_engine().url.render_as_string(hide_password=True)
+    return f"seen_urls_{hashlib.sha1(database.encode('utf-8')).hexdigest()[:12]}.bin"
+
+
+def _seed_seen_urls(seen_urls):
+    """Fill an empty seen-URL set from the live word URLs in the database."""
+    for record in get_all_alphabets():
+        seen_urls.add_many(get_word_urls_by_alphabet(record.alphabet, include_deleted=False))
+    logger.info(f"📋 Seeded the seen-URL set with {len(seen_urls)} word URLs from the database")
+
+
+def _import_legacy_checkpoints(seen_urls):
+    """Fold checkpoint_{alphabet}.txt files from earlier runs into the seen-URL set and remove them."""
+    for checkpoint_file in glob.glob("checkpoint_*.txt"):
+        with open(checkpoint_file) as f:
+            added = seen_urls.add_many(line.strip() for line in f if line.strip())
+        os.remove(checkpoint_file)
+        logger.info(f"📋 Imported {added} URLs from {checkpoint_file}")
+
+
+async def process_alphabet(playwright, ml_record, semaphore, parse_pool, seen_urls):
     """Process a single alphabet with its own browser instance"""
     async with semaphore:  # Limit concurrent browsers
         alphabet_url = ml_record.url
         alphabet = alphabet_url.split("/")[-1]
         logger.info(f"🔤 Starting scrape for alphabet: {alphabet}")
         
-        # Create checkpointing data
-        checkpoint_file = f"checkpoint_{alphabet}.txt"
-        processed_urls = set()
-        is_complete = False
-        
-        # Load checkpoint if exists
-        try:
-            with open(checkpoint_file, 'r') as f:
-                processed_urls = set(line.strip() for line in f.readlines())
-            logger.info(f"📋 Loaded checkpoint for {alphabet} with {len(processed_urls)} processed URLs")
-        except FileNotFoundError:
-            logger.info(f"No checkpoint found for {alphabet}, starting fresh")
-        
         browser = await playwright.chromium.launch(headless=True)
         page = await browser.new_page()
         
         try:
-            await page.goto(alphabet_url)
+            # The API backend and the dump loader store URLs without touching the seen set,
+            # so check what the alphabet already holds before inserting, as _save_new_urls does
+            stored_urls = await asyncio.to_thread(get_word_urls_by_alphabet, alphabet, False)
+            await rate_control.goto(page, alphabet_url)
             page_number = 1
             
             while True:
                 # Wait for either of the selectors
-                selector_used = await wait_for_either(page, [
-                    '//*[@id="mw-content-text"]/div[3]',
-                    '//*[@id="mw-content-text"]/div[2]'
-                ])
+                with metrics.WAIT_SECONDS.time():
+                    selector_used = await wait_for_either(page, [
+                        '//*[@id="mw-content-text"]/div[3]',
+                        '//*[@id="mw-content-text"]/div[2]'
+                    ])
                 
                 page_html = await page.content()
-                new_links = extract_links(page_html=page_html, selector_used=selector_used)
+                metrics.PAGES.inc()
+                # The pool records parse and queue time itself
+                new_links = await parse_pool.parse("links", page_html, selector_used, _BASE_URL)
+                metrics.LINKS.inc(len(new_links))
                 
-                # Process links in batches to avoid hammering the database
-                for link in tqdm(new_links, desc=f"Page {page_number}"):
-                    if link not in processed_urls:
-                        add_word(alphabet=alphabet, word_url=link)
-                        # Update checkpoint file after each word
-                        with open(checkpoint_file, 'a') as f:
-                            f.write(f"{link}\n")
-                        processed_urls.add(link)
+                # Save the page's unseen links in one batch, then mark them seen. The set
+                # is used from a worker thread so a compaction never stalls the other alphabets
+                unseen_links = await asyncio.to_thread(seen_urls.filter_new, new_links)
+                new_urls = [url for url in unseen_links if url not in stored_urls]
+                if new_urls:
+                    with metrics.DB_WRITE_SECONDS.time():
+                        add_words(alphabet, new_urls)
+                    stored_urls.update(new_urls)
+                if unseen_links:
+                    await asyncio.to_thread(seen_urls.add_many, unseen_links)
+                logger.info(f"📄 Page {page_number} of {alphabet}: {len(new_urls)} new of {len(new_links)} links")
                 
                 # Check for next button
                 next_button = await page.query_selector('xpath=//*[@id="mw-content-text"]/div[4]//a')
                 if not next_button:
                     logger.info(f"⛔ No more pages for alphabet {alphabet}")
-                    is_complete = True
                     break
                 
                 logger.info(f"➡️ Moving to page {page_number + 1} for alphabet {alphabet}")
-                await next_button.click()
-                await page.wait_for_load_state("networkidle")
+                # Navigate to the link target rather than clicking, so the request
+                # goes through the rate controller and its response is observed
+                next_url = urljoin(_BASE_URL, await next_button.get_attribute("href"))
+                await rate_control.goto(page, next_url)
                 page_number += 1
                 
         except Exception as e:
             logger.error(f"❌ Error processing alphabet {alphabet}: {str(e)}")
         finally:
             await browser.close()
-            
-            # Delete checkpoint file if processing completed successfully
-            if is_complete:
-                try:
-                    import os
-                    os.remove(checkpoint_file)
-                    logger.info(f"🗑️ Deleted checkpoint file for completed alphabet {alphabet}")
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not delete checkpoint file for {alphabet}: {str(e)}")
-            
             logger.info(f"✅ Completed scraping for alphabet {alphabet}")
 
 
-def extract_links(page_html, selector_used):
-    sel = Selector(text=page_html)
-    container = sel.xpath(selector_used)
-    links = container.xpath('.//a')
-
-    extracted = []
-    for link in links:
-        href = link.xpath('.//@href').get()
-        if href:
-            absolute_url = urljoin(_BASE_URL, href)
-            extracted.append(absolute_url)
-
-    return extracted
-
-
-async def scrape_word_url_per_alphabet(playwright, ml_records):
+async def scrape_word_url_per_alphabet(playwright, ml_records, seen_urls_path=None, reset_seen_urls=False):
     # Create a semaphore to limit concurrent browsers
     semaphore = asyncio.Semaphore(MAX_CONCURRENT_BROWSERS)
     
-    # Create tasks for each alphabet
-    tasks = []
-    for record in ml_records:
-        task = asyncio.create_task(process_alphabet(playwright, record, semaphore))
-        tasks.append(task)
-    
-    # Wait for all tasks to complete
-    await asyncio.gather(*tasks)
+    # Listing pages are parsed on a shared process pool, off the event loop
+    with ParsePool() as parse_pool, SeenSet(seen_urls_path or default_seen_urls_path()) as seen_urls:
+        if reset_seen_urls:
+            # The words behind the set were soft deleted and are scraped again
+            seen_urls.clear()
+        if not len(seen_urls):
+            _seed_seen_urls(seen_urls)
+        _import_legacy_checkpoints(seen_urls)
+        logger.info(f"📋 {len(seen_urls)} word URLs already seen")
+        # Create tasks for each alphabet
+        tasks = []
+        for record in ml_records:
+            task = asyncio.create_task(process_alphabet(playwright, record, semaphore, parse_pool, seen_urls))
+            tasks.append(task)
+        
+        # Wait for all tasks to complete
+        await asyncio.gather(*tasks)
 
 
-async def main_async():
+async def main_async(backend="browser"):
     async with async_playwright() as playwright:
         existing_alphabets = get_all_alphabets()
+        rescraping_deleted_words = False
         if len(existing_alphabets) < 50:
             logger.info("Less than 50 alphabets recorded. Either scrapping for the first time.")
             logger.info("Or db corrupted and rerunning scrapping - DB cleanup required if rerunning.")
             soft_delete_alphabets()
+            rescraping_deleted_words = True
             website = f"{_BASE_URL}/wiki/%E0%B4%B5%E0%B4%BF%E0%B4%95%E0%B5%8D%E0%B4%95%E0%B4%BF%E0%B4%A8%E0%B4%BF%E0%B4%98%E0%B4%A3%E0%B5%8D%E0%B4%9F%E0%B5%81:%E0%B4%89%E0%B4%B3%E0%B5%8D%E0%B4%B3%E0%B4%9F%E0%B4%95%E0%B5%8D%E0%B4%95%E0%B4%82"
             await scrape_alphabet_url(playwright, website)
         else:
@@ -184,12 +204,25 @@ async def main_async():
             logger.warning("Possibility of duplicate entries for these alphabets. Kindly take care of them manually.")
             ml_records=[record for record in ml_records if record.url.split("/")[-1] in _ALPHABET_RESCRAPPING_LIST]
 
-        if ml_records:
-            await scrape_word_url_per_alphabet(playwright, ml_records)
+        if ml_records and backend == "api":
+            saved = await asyncio.to_thread(wiktionary_api.populate_word_urls, ml_records, _BASE_URL)
+            logger.info(f"✅ Saved {saved} word URLs using the MediaWiki API")
+        elif ml_records:
+            await scrape_word_url_per_alphabet(playwright, ml_records, reset_seen_urls=rescraping_deleted_words)
 
 
 def main():
-    asyncio.run(main_async())
+    parser = argparse.ArgumentParser(description="Scrape word URLs per alphabet from ml.wiktionary.org")
+    parser.add_argument(
+        "--backend",
+        choices=["browser", "api"],
+        default="browser",
+        help="'browser' clicks through the alphabet listings, 'api' enumerates them with the MediaWiki allpages API",
+    )
+    args = parser.parse_args()
+
+    metrics.setup_metrics("url_scrapper")
+    asyncio.run(main_async(backend=args.backend))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,202 @@
+"""
+Word URL enumeration through the MediaWiki API.
+
+Instead of clicking through the paginated alphabet listings, titles are listed
+with ``list=allpages`` (``apprefix`` = the alphabet) using the maximum page size
+and following continuation tokens. Each alphabet is split on its second
+character into ``apfrom``/``apto`` ranges and the ranges of all alphabets are
+enumerated in parallel, so one large alphabet does not serialise its
+continuation chain; an alphabet is counted and saved once its last range is in.
+The requests go through the shared rate controller and the results are written
+with the same crud functions as the browser scraper.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote, unquote, urlencode
+from datetime import datetime, timezone
+import urllib.request
+import urllib.error
+import logging
+import json
+
+from lingua.database.crud import add_words, get_word_urls_by_alphabet
+from lingua.data import metrics, rate_control
+
+logger = logging.getLogger(__name__)
+
+_BASE_URL = "https://ml.wiktionary.org"
+_API_PATH = "/w/api.php"
+_USER_AGENT = "LinguAalayam/0.1 (https://github.com/zaksaiplayground/LinguAalayam)"
+_MAX_PARALLEL_PREFIXES = 8
+# Second characters at which an alphabet's title ranges start (titles sort by code point):
+# ട and പ split the consonants, ാ starts the vowel signs, ് the virama and chillus.
+_RANGE_SPLITS = ("\u0d1f", "\u0d2a", "\u0d3e", "\u0d4d")
+_MAX_RETRIES = 3
+# Characters MediaWiki leaves unescaped in /wiki/ links
+_TITLE_SAFE_CHARS = ";@$!*(),/~:"
+
+
+def api_url(base_url=_BASE_URL):
+    return f"{base_url}{_API_PATH}"
+
+
+def parse_mw_timestamp(value):
+    """Parse a MediaWiki ``2025-01-31T12:00:00Z`` timestamp into an aware datetime."""
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+def format_mw_timestamp(value):
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def title_to_word_url(title, base_url=_BASE_URL):
+    """Build the /wiki/ URL for a page title exactly as the rendered listing links it."""
+    return f"{base_url}/wiki/{quote(title.replace(' ', '_'), safe=_TITLE_SAFE_CHARS)}"
+
+
+def api_get(endpoint, params):
+    """GET one API response as JSON, under the host's rate controller."""
+    params = {**params, "format": "json", "formatversion": "2"}
+    url = f"{endpoint}?{urlencode(params)}"
+    request = urllib.request.Request(url, headers={"User-Agent": _USER_AGENT})
+    controller = rate_control.controller_for(endpoint)
+
+    for attempt in range(_MAX_RETRIES + 1):
+        with controller.sync_slot() as outcome:
+            try:
+                with metrics.FETCH_SECONDS.time():
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        outcome.status = response.status
+                        payload = json.load(response)
+            except urllib.error.HTTPError as e:
+                outcome.status = e.code
+                outcome.retry_after = e.headers.get("Retry-After")
+                if not outcome.should_retry or attempt == _MAX_RETRIES:
+                    raise
+        if not outcome.should_retry:
+            metrics.PAGES.inc()
+            if "error" in payload:
+                raise RuntimeError(f"MediaWiki API error: {payload['error']}")
+            return payload
+        metrics.RETRIES.inc()
+        logger.warning(f"🔁 Got {outcome.status} from the API, retrying ({attempt + 1}/{_MAX_RETRIES})")
+
+
+def iter_query(endpoint, params, list_name):
+    """Yield every batch of a ``list=`` query, following the continuation tokens."""
+    continuation = {}
+    while True:
+        payload = api_get(endpoint, {"action": "query", "list": list_name, **params, **continuation})
+        yield payload.get("query", {}).get(list_name, [])
+        if "continue" not in payload:
+            return
+        continuation = payload["continue"]
+
+
+def iter_allpages(endpoint, prefix, namespace=0, start=None, stop=None):
+    """Yield batches of page titles starting with `prefix`, from `start` up to and including `stop`."""
+    params = {"apprefix": prefix, "apnamespace": namespace, "aplimit": "max", "apfilterredir": "nonredirects"}
+    if start is not None:
+        params["apfrom"] = start
+    if stop is not None:
+        params["apto"] = stop
+    for batch in iter_query(endpoint, params, "allpages"):
+        yield [page["title"] for page in batch]
+
+
+def iter_category_members(endpoint, category, namespace=0):
+    """Yield batches of page titles in `category` (with or without the namespace prefix)."""
+    params = {"cmtitle": category, "cmnamespace": namespace, "cmlimit": "max", "cmtype": "page"}
+    for batch in iter_query(endpoint, params, "categorymembers"):
+        yield [page["title"] for page in batch]
+
+
+def alphabet_ranges(alphabet, splits=_RANGE_SPLITS):
+    """
+    Disjoint (start, stop) title ranges covering every title that starts with
+    `alphabet`; start is inclusive, stop exclusive, None means unbounded.
+    """
+    prefix = unquote(alphabet)
+    bounds = [None] + [prefix + split for split in splits] + [None]
+    return list(zip(bounds, bounds[1:]))
+
+
+def enumerate_range(alphabet, start, stop, base_url=_BASE_URL):
+    """List the word URLs of `alphabet` whose titles fall in [start, stop). Returns (alphabet, urls)."""
+    urls = []
+    # apto is inclusive: the title equal to `stop` belongs to the next range
+    for titles in iter_allpages(api_url(base_url), unquote(alphabet), start=start, stop=stop):
+        urls.extend(title_to_word_url(title, base_url) for title in titles if stop is None or title < stop)
+    return alphabet, urls
+
+
+def sort_alphabets(alphabets):
+    """Order alphabet keys longest first, so `alphabet_for_title` prefers the most specific match."""
+    return sorted(alphabets, key=lambda alphabet: len(unquote(alphabet)), reverse=True)
+
+
+def alphabet_for_title(title, sorted_alphabets):
+    """The first alphabet of `sorted_alphabets` that `title` starts with, or None."""
+    return next((a for a in sorted_alphabets if title.startswith(unquote(a))), None)
+
+
+def _save_new_urls(alphabet, urls):
+    existing = get_word_urls_by_alphabet(alphabet)
+    new_urls = [url for url in dict.fromkeys(urls) if url not in existing]
+    if new_urls:
+        with metrics.DB_WRITE_SECONDS.time():
+            add_words(alphabet=alphabet, word_urls=new_urls)
+    logger.info(f"✅ Saved {len(new_urls)} new word URLs for alphabet {unquote(alphabet)}")
+    return len(new_urls)
+
+
+def populate_word_urls(ml_records, base_url=_BASE_URL, max_workers=_MAX_PARALLEL_PREFIXES):
+    """
+    Enumerate the title ranges of every alphabet of `ml_records` in parallel and
+    store word URLs that are not in the database yet. Returns the number of new URLs.
+    """
+    alphabets = [record.url.split("/")[-1] for record in ml_records]
+    pending = {alphabet: len(alphabet_ranges(alphabet)) for alphabet in alphabets}
+    found = {alphabet: [] for alphabet in alphabets}
+    saved = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(enumerate_range, alphabet, start, stop, base_url): (alphabet, start)
+            for alphabet in alphabets
+            for start, stop in alphabet_ranges(alphabet)
+        }
+        # Writes stay on this thread, once per alphabet; only the HTTP enumeration runs in the pool
+        for future in as_completed(futures):
+            alphabet, start = futures[future]
+            try:
+                found[alphabet].extend(future.result()[1])
+            except Exception as e:
+                logger.error(f"❌ Error enumerating alphabet {alphabet} from {start or 'the start'}: {str(e)}")
+            pending[alphabet] -= 1
+            if pending[alphabet] == 0:
+                urls = found.pop(alphabet)
+                metrics.LINKS.inc(len(urls))
+                logger.info(f"🔤 Enumerated {len(urls)} words for alphabet {unquote(alphabet)}")
+                saved += _save_new_urls(alphabet, urls)
+    return saved
+
+
+def populate_word_urls_from_category(category, ml_records, base_url=_BASE_URL):
+    """
+    Store the word URLs of every page in `category`, assigning each title to the
+    longest alphabet it starts with. Titles matching no alphabet are skipped.
+    """
+    alphabets = sort_alphabets(record.url.split("/")[-1] for record in ml_records)
+    by_alphabet = {}
+    for titles in iter_category_members(api_url(base_url), category):
+        for title in titles:
+            alphabet = alphabet_for_title(title, alphabets)
+            if alphabet is None:
+                logger.warning(f"⚠️ No alphabet matches '{title}', skipping")
+                continue
+            by_alphabet.setdefault(alphabet, []).append(title_to_word_url(title, base_url))
+
+    saved = 0
+    for alphabet, urls in by_alphabet.items():
+        metrics.LINKS.inc(len(urls))
+        saved += _save_new_urls(alphabet, urls)
+    return saved
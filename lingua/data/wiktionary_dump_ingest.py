@@ -0,0 +1,283 @@
+"""
+Offline (re)build of the dictionary tables from a Wiktionary XML dump.
+
+``ingest-wiktionary-dump mlwiktionary-latest-pages-articles.xml.bz2``
+
+The bz2 file is split into its compression blocks by locating the 48-bit block
+magic at bit level, so both single-stream and ``-multistream`` dumps decompress
+in parallel on a process pool. Each block is re-wrapped as a standalone bz2
+stream, decompressed by a worker and fed, in order and with a bounded number
+of blocks in flight, to an incremental XML pull parser that discards every
+page once it is handled. Memory therefore stays constant regardless of dump size.
+
+Article pages get the same definition rule as the scraper (applied to their
+wikitext) and are bulk loaded into ``alphabet_url``, ``word_url`` and
+``word_definition``.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+from collections import deque
+import argparse
+import bisect
+import logging
+import mmap
+import uuid
+import bz2
+import os
+
+from lingua.database.crud import get_all_alphabets, upsert_alphabet, get_word_url_index, bulk_load_words
+from lingua.data import metrics
+from lingua.data.definition_rules import extract_definitions_from_wikitext, word_from_url
+from lingua.data.wiktionary_api import title_to_word_url, sort_alphabets, alphabet_for_title, parse_mw_timestamp
+
+logger = logging.getLogger(__name__)
+
+_BASE_URL = "https://ml.wiktionary.org"
+_BLOCK_MAGIC = 0x314159265359  # pi, starts every compressed block
+_EOS_MAGIC = 0x177245385090  # sqrt(pi), ends every stream
+_MAGIC_BITS = 48
+_READ_SIZE = 1 << 20
+_BATCH_SIZE = 5000
+_ARTICLE_NAMESPACE = "0"
+_MALAYALAM_BLOCK = ("\u0d00", "\u0d7f")
+
+
+# ---------- PARALLEL BZ2 DECOMPRESSION ----------
+
+def _find_bit_pattern(data, pattern):
+    """Bit offsets of every occurrence of a 48-bit `pattern` in `data`."""
+    offsets = []
+    for shift in range(8):
+        # Lay the pattern out `shift` bits into a 7-byte window. Bytes 1..5 are
+        # always fully covered by the pattern, so they can be searched with the
+        # C-level find and the partial bytes checked afterwards.
+        window = (pattern << (8 - shift)).to_bytes(7, "big")
+        mask = (((1 << _MAGIC_BITS) - 1) << (8 - shift)).to_bytes(7, "big")
+        expected = int.from_bytes(window, "big")
+        mask = int.from_bytes(mask, "big")
+        key = window[1:6]
+        position = data.find(key, 1)
+        while position != -1:
+            start = position - 1
+            if start + 7 <= len(data) and int.from_bytes(data[start:start + 7], "big") & mask == expected:
+                offsets.append(start * 8 + shift)
+            position = data.find(key, position + 1)
+    return sorted(offsets)
+
+
+def find_blocks(data):
+    """
+    Bit ranges ``(start, end)`` of the compressed blocks in `data`. A block runs
+    from its magic to the next block magic or end-of-stream marker.
+    """
+    block_starts = _find_bit_pattern(data, _BLOCK_MAGIC)
+    boundaries = sorted(set(block_starts) | set(_find_bit_pattern(data, _EOS_MAGIC)))
+    blocks = []
+    for start in block_starts:
+        index = bisect.bisect_right(boundaries, start)
+        if index < len(boundaries):
+            blocks.append((start, boundaries[index]))
+    return blocks
+
+
+def _decompress_block(chunk, bit_offset, bit_length, level):
+    """Decompress one block, given the bytes holding it and its bit position within them."""
+    total_bits = len(chunk) * 8
+    value = int.from_bytes(chunk, "big") >> (total_bits - bit_offset - bit_length)
+    value &= (1 << bit_length) - 1
+    # The block CRC follows the block magic. For a single-block stream the
+    # combined stream CRC is the block CRC itself.
+    block_crc = (value >> (bit_length - _MAGIC_BITS - 32)) & 0xFFFFFFFF
+    value = (((value << _MAGIC_BITS) | _EOS_MAGIC) << 32) | block_crc
+    bits = bit_length + _MAGIC_BITS + 32
+    padding = -bits % 8
+    stream = b"BZh" + level + (value << padding).to_bytes((bits + padding) // 8, "big")
+    return bz2.decompress(stream)
+
+
+def iter_decompressed_blocks(path, workers=None):
+    """Yield the decompressed content of a bz2 file block by block, in order."""
+    workers = workers or os.cpu_count() or 1
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[:3] != b"BZh":
+            raise ValueError(f"{path} is not a bz2 file")
+        level = data[3:4]
+        blocks = find_blocks(data)
+        logger.info(f"📦 Found {len(blocks)} bz2 blocks, decompressing on {workers} processes")
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for start, end in blocks:
+                byte_start, byte_end = start // 8, (end + 7) // 8
+                pending.append(pool.submit(
+                    _decompress_block, data[byte_start:byte_end], start - byte_start * 8, end - start, level
+                ))
+                # Bound the blocks in flight so memory does not grow with the dump
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+def iter_dump_chunks(path, workers=None):
+    """Yield raw XML bytes of a dump, decompressing ``.bz2`` files in parallel."""
+    if str(path).endswith(".bz2"):
+        yield from iter_decompressed_blocks(path, workers)
+        return
+    with open(path, "rb") as f:
+        while chunk := f.read(_READ_SIZE):
+            yield chunk
+
+
+# ---------- STREAMING XML PARSE ----------
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _page_record(page):
+    """Flatten a <page> element into a dict of the fields the loader needs."""
+    record = {"redirect": False}
+    for child in page:
+        name = _local_name(child.tag)
+        if name in ("title", "ns", "id"):
+            record[name] = child.text
+        elif name == "redirect":
+            record["redirect"] = True
+        elif name == "revision":
+            for field in child:
+                field_name = _local_name(field.tag)
+                if field_name == "id":
+                    record["rev_id"] = field.text
+                elif field_name == "timestamp":
+                    record["timestamp"] = field.text
+                elif field_name == "text":
+                    record["text"] = field.text or ""
+    return record
+
+
+def iter_pages(chunks):
+    """Yield one dict per <page> of the dump, clearing parsed pages as it goes."""
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    root = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if root is None and event == "start":
+                root = element
+            elif event == "end" and _local_name(element.tag) == "page":
+                yield _page_record(element)
+                root.clear()
+    parser.close()
+
+
+# ---------- BULK LOAD ----------
+
+def _is_malayalam_letter(ch):
+    return _MALAYALAM_BLOCK[0] <= ch <= _MALAYALAM_BLOCK[1] and ch.isalpha()
+
+
+def ingest_dump(path, base_url=_BASE_URL, workers=None, batch_size=_BATCH_SIZE):
+    """
+    Load every article page of the dump at `path`. New words are inserted with
+    their definitions; stored words that have no definitions yet get them.
+    Returns a dict of counts.
+    """
+    alphabets = sort_alphabets(record.alphabet for record in get_all_alphabets())
+    known_urls = get_word_url_index()
+    logger.info(f"📋 {len(known_urls)} word URLs and {len(alphabets)} alphabets already in the database")
+
+    stats = {"pages": 0, "words": 0, "definitions": 0, "completed": 0, "skipped": 0, "other_script": 0}
+    word_rows, definition_rows, reviewed, revision_rows = [], [], [], []
+
+    def flush():
+        with metrics.DB_WRITE_SECONDS.time():
+            bulk_load_words(word_rows, definition_rows, reviewed, revision_rows)
+        word_rows.clear()
+        definition_rows.clear()
+        reviewed.clear()
+        revision_rows.clear()
+
+    for page in iter_pages(iter_dump_chunks(path, workers)):
+        stats["pages"] += 1
+        metrics.PAGES.inc()
+        title = page.get("title")
+        if page.get("ns") != _ARTICLE_NAMESPACE or page["redirect"] or not title:
+            stats["skipped"] += 1
+            continue
+
+        alphabet = alphabet_for_title(title, alphabets)
+        if alphabet is None:
+            if not _is_malayalam_letter(title[0]):
+                # English and other-script entries are not crawled per alphabet; don't invent alphabets for them
+                stats["other_script"] += 1
+                continue
+            alphabet = title[0]
+            upsert_alphabet(alphabet, f"{base_url}/wiki/Special:PrefixIndex/{alphabet}")
+            alphabets = sort_alphabets(alphabets + [alphabet])
+
+        word_url = title_to_word_url(title, base_url)
+        word = word_from_url(word_url)
+        definitions = extract_definitions_from_wikitext(page.get("text", ""), title)
+        revision = {
+            "rev_id": int(page["rev_id"]) if page.get("rev_id") else None,
+            "rev_timestamp": parse_mw_timestamp(page["timestamp"]) if page.get("timestamp") else None,
+        }
+
+        if word_url in known_urls:
+            word_uuid, has_definitions = known_urls[word_url]
+            if has_definitions or not definitions:
+                continue
+            reviewed.append(word_uuid)
+            revision_rows.append({"word_uuid": word_uuid, **revision})
+            stats["completed"] += 1
+        else:
+            word_uuid = uuid.uuid4()
+            word_rows.append({
+                "word_uuid": word_uuid,
+                "alphabet": alphabet,
+                "word_url": word_url,
+                "needs_review": not definitions,
+                **revision,
+            })
+            stats["words"] += 1
+        known_urls[word_url] = (word_uuid, bool(definitions))
+
+        definition_rows.extend(
+            {"word_uuid": word_uuid, "definition": definition, "word": word, "is_deleted": False}
+            for definition in definitions
+        )
+        stats["definitions"] += len(definitions)
+        metrics.DEFINITIONS.inc(len(definitions))
+
+        if len(word_rows) + len(definition_rows) >= batch_size:
+            flush()
+            logger.info(f"Progress: {stats}")
+
+    flush()
+    return stats
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("dump_ingest.log"),
+            logging.StreamHandler()
+        ]
+    )
+    parser = argparse.ArgumentParser(description="Load a Wiktionary XML dump into the database")
+    parser.add_argument("dump", help="path to mlwiktionary-*-pages-articles[-multistream].xml[.bz2]")
+    parser.add_argument("--workers", type=int, default=None, help="decompression processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=_BATCH_SIZE, help="rows per bulk insert")
+    parser.add_argument("--base-url", default=_BASE_URL, help="wiki the word URLs point to")
+    args = parser.parse_args()
+
+    metrics.setup_metrics("wiktionary_dump_ingest")
+    stats = ingest_dump(args.dump, base_url=args.base_url, workers=args.workers, batch_size=args.batch_size)
+    logger.info(f"✅ Dump ingested: {stats}")
+
+
+if __name__ == "__main__":
+    main()
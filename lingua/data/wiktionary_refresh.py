@@ -0,0 +1,210 @@
+"""
+Incremental refresh of word definitions based on page revisions.
+
+``refresh-wiktionary`` asks the MediaWiki API which tracked pages changed since
+the last refresh and re-parses only those:
+
+* ``--mode recentchanges`` (default) walks ``list=recentchanges`` from the start
+  of the last refresh that completed, so a nightly run costs a few requests per
+  edit. That high-water mark (``refresh_state``) only moves once a whole run has
+  been written, so a run that fails halfway is repeated rather than skipped;
+* ``--mode revisions`` compares the current revision id of every tracked page,
+  50 titles per request. Use it for the first run, or when the last refresh is
+  older than the wiki's recent changes retention (30 days by default).
+
+Changed pages are fetched 50 at a time with their wikitext, parsed with the
+same definition rule as the dump loader and written back in one transaction
+per batch. Pages with no stored revision yet (e.g. scraped through the browser)
+are re-fetched and re-parsed once in revisions mode, since nothing says their
+definitions match the current revision; ``--no-reparse-untracked`` records them
+as current instead, which only costs the revision lookups.
+"""
+from datetime import datetime, timedelta, timezone
+from urllib.parse import unquote
+import argparse
+import logging
+
+from lingua.database.crud import (
+    get_word_revision_index,
+    get_latest_revision_timestamp,
+    get_refresh_high_water,
+    set_refresh_high_water,
+    update_word_revisions,
+    refresh_word_definitions
+)
+from lingua.data import metrics
+from lingua.data.definition_rules import extract_definitions_from_wikitext, word_from_url
+from lingua.data.wiktionary_api import (
+    api_url,
+    api_get,
+    iter_query,
+    parse_mw_timestamp,
+    format_mw_timestamp
+)
+
+logger = logging.getLogger(__name__)
+
+_BASE_URL = "https://ml.wiktionary.org"
+_TITLES_PER_REQUEST = 50  # MediaWiki limit for titles= without apihighlimits
+_RECENT_CHANGES_OVERLAP = timedelta(minutes=5)  # re-read a little history to cover clock skew
+_HIGH_WATER_NAME = "wiktionary_refresh"
+
+
+def title_from_word_url(word_url):
+    return unquote(word_url.split("/")[-1]).replace("_", " ")
+
+
+def _batches(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def fetch_revisions(endpoint, titles, with_content=False):
+    """Latest revision of each title: {title: {"revid", "timestamp"[, "content"]}}. Missing pages are omitted."""
+    rvprop = "ids|timestamp|content" if with_content else "ids|timestamp"
+    payload = api_get(endpoint, {
+        "action": "query",
+        "prop": "revisions",
+        "titles": "|".join(titles),
+        "rvprop": rvprop,
+        "rvslots": "main",
+    })
+    revisions = {}
+    for page in payload.get("query", {}).get("pages", []):
+        if page.get("missing") or not page.get("revisions"):
+            continue
+        revision = page["revisions"][0]
+        revisions[page["title"]] = {
+            "revid": revision["revid"],
+            "timestamp": revision["timestamp"],
+            "content": revision.get("slots", {}).get("main", {}).get("content", ""),
+        }
+    return revisions
+
+
+def changed_titles_from_recent_changes(endpoint, tracked, since):
+    """Titles of tracked pages edited since `since` whose latest revision differs from the stored one."""
+    params = {
+        "rcstart": format_mw_timestamp(since - _RECENT_CHANGES_OVERLAP),
+        "rcdir": "newer",
+        "rcnamespace": 0,
+        "rctype": "edit|new",
+        "rcprop": "title|ids|timestamp",
+        "rclimit": "max",
+    }
+    latest = {}
+    for batch in iter_query(endpoint, params, "recentchanges"):
+        for change in batch:
+            if change["title"] in tracked:
+                latest[change["title"]] = max(latest.get(change["title"], 0), change["revid"])
+    return [title for title, revid in latest.items() if revid != tracked[title][1]]
+
+
+def changed_titles_from_revisions(endpoint, tracked, reparse_untracked=True):
+    """
+    Compare the current revision of every tracked page with the stored one.
+    Pages that were never tracked count as changed, or with reparse_untracked=False
+    are recorded as current. Returns the changed titles.
+    """
+    changed, candidates = [], sorted(tracked)
+    if reparse_untracked:
+        # No stored revision to compare with: refresh_titles fetches their content and records the revision
+        changed = [title for title in candidates if tracked[title][1] is None]
+        candidates = [title for title in candidates if tracked[title][1] is not None]
+    for titles in _batches(candidates, _TITLES_PER_REQUEST):
+        unseen = []
+        for title, revision in fetch_revisions(endpoint, titles).items():
+            word_uuid, stored_rev_id, _ = tracked[title]
+            if stored_rev_id is None:
+                unseen.append({
+                    "word_uuid": word_uuid,
+                    "rev_id": revision["revid"],
+                    "rev_timestamp": parse_mw_timestamp(revision["timestamp"]),
+                })
+            elif revision["revid"] != stored_rev_id:
+                changed.append(title)
+        if unseen:
+            with metrics.DB_WRITE_SECONDS.time():
+                update_word_revisions(unseen)
+    return changed
+
+
+def refresh_titles(endpoint, tracked, titles):
+    """Re-fetch and re-parse `titles`, replacing their definitions. Returns the number of refreshed pages."""
+    refreshed = 0
+    for batch in _batches(titles, _TITLES_PER_REQUEST):
+        updates = []
+        for title, revision in fetch_revisions(endpoint, batch, with_content=True).items():
+            word_uuid, _, word_url = tracked[title]
+            with metrics.PARSE_SECONDS.time():
+                definitions = extract_definitions_from_wikitext(revision["content"], title)
+            metrics.DEFINITIONS.inc(len(definitions))
+            updates.append({
+                "word_uuid": word_uuid,
+                "word": word_from_url(word_url),
+                "definitions": definitions,
+                "rev_id": revision["revid"],
+                "rev_timestamp": parse_mw_timestamp(revision["timestamp"]),
+            })
+        if updates:
+            with metrics.DB_WRITE_SECONDS.time():
+                refresh_word_definitions(updates)
+            refreshed += len(updates)
+            logger.info(f"🔄 Refreshed {refreshed}/{len(titles)} changed pages")
+    return refreshed
+
+
+def refresh(mode="recentchanges", base_url=_BASE_URL, since=None, reparse_untracked=True):
+    """Refresh the definitions of pages changed upstream. Returns a dict of counts."""
+    endpoint = api_url(base_url)
+    started = datetime.now(timezone.utc)
+    # title -> (word_uuid, rev_id, word_url)
+    tracked = {
+        title_from_word_url(word_url): (word_uuid, rev_id, word_url)
+        for word_url, (word_uuid, rev_id) in get_word_revision_index().items()
+    }
+
+    if mode == "recentchanges":
+        # Databases refreshed before refresh_state existed fall back to the newest stored revision
+        since = since or get_refresh_high_water(_HIGH_WATER_NAME) or get_latest_revision_timestamp()
+        if since is None:
+            logger.warning("⚠️ No revisions stored yet, falling back to a full revision comparison")
+            mode = "revisions"
+        else:
+            logger.info(f"🕒 Looking for changes since {format_mw_timestamp(since)}")
+            changed = changed_titles_from_recent_changes(endpoint, tracked, since)
+    if mode == "revisions":
+        changed = changed_titles_from_revisions(endpoint, tracked, reparse_untracked)
+
+    logger.info(f"📋 {len(changed)} of {len(tracked)} tracked pages changed")
+    refreshed = refresh_titles(endpoint, tracked, changed)
+    # Every change before `started` is now written; a failure above leaves the mark where it was
+    set_refresh_high_water(_HIGH_WATER_NAME, started)
+    return {"tracked": len(tracked), "changed": len(changed), "refreshed": refreshed, "mode": mode}
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("refresh.log"),
+            logging.StreamHandler()
+        ]
+    )
+    parser = argparse.ArgumentParser(description="Re-parse Wiktionary pages that changed since the last run")
+    parser.add_argument("--mode", choices=["recentchanges", "revisions"], default="recentchanges")
+    parser.add_argument("--since", type=parse_mw_timestamp, default=None,
+                        help="override the start of the recent changes window, e.g. 2025-01-31T00:00:00Z")
+    parser.add_argument("--base-url", default=_BASE_URL)
+    parser.add_argument("--reparse-untracked", action=argparse.BooleanOptionalAction, default=True,
+                        help="in revisions mode, re-parse pages with no stored revision instead of recording them as current")
+    args = parser.parse_args()
+
+    metrics.setup_metrics("wiktionary_refresh")
+    stats = refresh(mode=args.mode, base_url=args.base_url, since=args.since, reparse_untracked=args.reparse_untracked)
+    logger.info(f"✅ Refresh finished: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
 from playwright.sync_api import sync_playwright, Playwright
-from parsel import Selector
 from tqdm import tqdm
+from collections import deque
 import logging
-from urllib.parse import unquote
 
 from lingua.database.crud import (
     get_words_for_review, 
     insert_word_definitions, 
     update_word_needs_review
 )
+from lingua.data import metrics, rate_control
+from lingua.data.definition_rules import word_from_url
+from lingua.data.parse_pool import ParsePool
 
 # Set up logging
 logging.basicConfig(
@@ -21,6 +23,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_MAX_PAGES_PARSED_AHEAD = 32 # pages fetched but not yet saved while the pool parses them
+_PARSE_BATCH_SIZE = 4
+
 def scrape_definitions_from_db(playwright: Playwright):
     """
     Scrapes definitions for words marked for review in the database.
@@ -29,14 +34,55 @@ def scrape_definitions_from_db(playwright: Playwright):
     2. Extracts definitions if available
     3. Inserts definitions into the word_definition table
     4. Updates the word's needs_review flag to False if definitions are found
+
+    Parsing runs on a process pool, so the browser keeps fetching the next pages
+    while earlier ones are parsed; results are saved in page order.
     """
     browser = playwright.chromium.launch(headless=True)
     page = browser.new_page()
+    parse_pool = ParsePool(batch_size=_PARSE_BATCH_SIZE)
     
     # Batch processing settings
     BATCH_SIZE = 100
     processed_count = 0
     success_count = 0
+    total_words = 0
+    pending = deque() # (word_uuid, word, future of the parsed definitions)
+
+    def save_parsed(max_pending):
+        """Save parsed pages in order until at most `max_pending` remain unsaved."""
+        nonlocal processed_count, success_count
+        while pending and (pending[0][2].done() or len(pending) > max_pending):
+            word_uuid, word, parsed = pending.popleft()
+            try:
+                if not parsed.done():
+                    parse_pool.flush()
+                # Parse time is recorded by the pool, from the worker's own timing
+                definitions = parsed.result()
+                
+                # Update database if definitions were found
+                if definitions:
+                    logger.info(f"Found {len(definitions)} definitions for '{word}'")
+                    metrics.DEFINITIONS.inc(len(definitions))
+                    
+                    with metrics.DB_WRITE_SECONDS.time():
+                        # Insert scraped definitions into word_definition table
+                        insert_word_definitions(word_uuid, definitions, word_text=word)
+                        
+                        # Update needs_review to False
+                        update_word_needs_review(word_uuid)
+                    
+                    success_count += 1
+                else:
+                    logger.warning(f"No definitions found for '{word}'")
+                
+                processed_count += 1
+                
+                # Log progress at regular intervals
+                if processed_count % 20 == 0:
+                    logger.info(f"Progress: {processed_count}/{total_words} words processed ({success_count} with definitions)")
+            except Exception as e:
+                logger.error(f"❌ Error saving definitions of {word}: {str(e)}")
     
     try:
         # Get all word URLs where 'needs_review' is True
@@ -51,92 +97,46 @@ def scrape_definitions_from_db(playwright: Playwright):
                 continue
             
             # Extract the word name from URL
-            word = unquote(url.split("/")[-1])
+            word = word_from_url(url)
             word_uuid = word_obj.word_uuid
             
             try:
                 logger.info(f"Processing word: {word} (UUID: {word_uuid})")
-                page.goto(url, timeout=30000)  # Increased timeout for slow connections
+                rate_control.goto_sync(page, url, timeout=30000)  # Increased timeout for slow connections
                 
                 # Wait for content to load
                 try:
-                    page.wait_for_selector('//*[@id="mw-content-text"]/div[1]', timeout=15000)
+                    with metrics.WAIT_SECONDS.time():
+                        page.wait_for_selector('//*[@id="mw-content-text"]/div[1]', timeout=15000)
                 except Exception as e:
+                    metrics.TIMEOUTS.inc()
                     logger.warning(f"Wait timeout for {word}: {e}")
                     continue
                     
                 page_html = page.content()
+                metrics.PAGES.inc()
                 
-                # Parse content using Selector
-                sel = Selector(text=page_html)
-                content_div = sel.xpath('//*[@id="mw-content-text"]/div[1]')
-                
-                # Find all <b> tags that exactly match the word
-                bolds = content_div.xpath(f'.//b[normalize-space(.)="{word}"]')
-                
-                # If direct match not found, try a more relaxed search
-                if not bolds:
-                    bolds = content_div.xpath(f'.//b[contains(., "{word}")]')
-                
-                definitions = []
-                
-                # Process each bold tag that might be the word heading
-                for bold in bolds:
-                    # Look for definition lists after the bold tag
-                    ancestor = bold.xpath('./ancestor::*[self::p or self::div][1]')
-                    
-                    # Find all list elements (ordered or unordered) that follow the ancestor
-                    lists = ancestor.xpath('./following-sibling::*[self::ul or self::ol][position()=1]')
-                    
-                    for lst in lists:
-                        # Extract each list item as a definition
-                        list_items = lst.xpath('./li')
-                        for li in list_items:
-                            definition_text = li.xpath('normalize-space(string())').get()
-                            if definition_text and len(definition_text.strip()) > 0:
-                                definitions.append(definition_text)
-                    
-                    # If no definitions found using that approach, try a fallback method
-                    if not definitions:
-                        fallback_lis = bold.xpath('./following::*[self::ul or self::ol][1]/li')
-                        for li in fallback_lis:
-                            definition_text = li.xpath('normalize-space(string())').get()
-                            if definition_text and len(definition_text.strip()) > 0:
-                                definitions.append(definition_text)
-                
-                # Update database if definitions were found
-                if definitions:
-                    logger.info(f"Found {len(definitions)} definitions for '{word}'")
-                    
-                    # Insert scraped definitions into word_definition table
-                    insert_word_definitions(word_uuid, definitions, word_text=word)
-                    
-                    # Update needs_review to False
-                    update_word_needs_review(word_uuid)
-                    
-                    success_count += 1
-                else:
-                    logger.warning(f"No definitions found for '{word}'")
-                
-                processed_count += 1
-                
-                # Log progress at regular intervals
-                if processed_count % 20 == 0:
-                    logger.info(f"Progress: {processed_count}/{total_words} words processed ({success_count} with definitions)")
+                # Parse in the pool while the browser moves on to the next word
+                pending.append((word_uuid, word, parse_pool.submit("definitions", page_html, word)))
+                save_parsed(max_pending=_MAX_PAGES_PARSED_AHEAD)
                 
             except Exception as e:
                 logger.error(f"❌ Error scraping {word}: {str(e)}")
                 continue
+        
+        save_parsed(max_pending=0)
     
     except Exception as e:
         logger.error(f"Fatal error in scraper: {str(e)}")
     finally:
         browser.close()
+        parse_pool.close()
         logger.info(f"Scraping completed. Processed {processed_count} words. Found definitions for {success_count} words.")
 
 def main():
     """Main function to run the definition scraper"""
     logger.info("Starting definition scraper")
+    metrics.setup_metrics("wiktionary_train_data_extractor")
     with sync_playwright() as playwright:
         scrape_definitions_from_db(playwright)
     logger.info("Definition scraper finished")
@@ -0,0 +1,105 @@
+"""
+Lazily built database engine and sessions.
+
+Nothing here connects, reads ``.env`` or imports a DB driver until the first
+session is opened. The backend is picked from ``LINGUA_DATABASE_URL``:
+
+    LINGUA_DATABASE_URL=sqlite:///lingua.db     local file, WAL journal
+    LINGUA_DATABASE_URL=postgresql+psycopg2://...
+    LINGUA_DATABASE_URL=postgresql+psycopg://...      psycopg 3
+
+Without it the Postgres URL is assembled from the ``user``/``password``/``host``/
+``port``/``dbname`` variables, as before.
+
+``python -m lingua.database.connection`` measures the import time of the
+database modules.
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+import threading
+import os
+
+_SQLITE_BUSY_TIMEOUT_MS = 5000
+
+_engine = None
+_sessionmaker = None
+_lock = threading.Lock()
+
+
+def database_url():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    url = os.getenv("LINGUA_DATABASE_URL")
+    if url:
+        return url
+    user, pwd, host, port, dbname = (os.getenv(k) for k in ("user", "password", "host", "port", "dbname"))
+    return f"postgresql+psycopg2://{user}:{pwd}@{host}:{port}/{dbname}?sslmode=require"
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers (the reviewer app, lookups) run while a scraper writes
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute(f"PRAGMA busy_timeout={_SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def make_engine(url):
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(engine, "connect", _configure_sqlite)
+        return engine
+    return create_engine(url, pool_pre_ping=True)
+
+
+def get_engine():
+    """The process-wide engine, built on first use."""
+    global _engine, _sessionmaker
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _sessionmaker = sessionmaker(bind=make_engine(database_url()))
+                _engine = _sessionmaker.kw["bind"]
+    return _engine
+
+
+def configure(url):
+    """Point the process at another database (e.g. a scratch SQLite file); disposes the current engine."""
+    global _engine, _sessionmaker
+    with _lock:
+        if _engine is not None:
+            _engine.dispose()
+        _sessionmaker = sessionmaker(bind=make_engine(url))
+        _engine = _sessionmaker.kw["bind"]
+    return _engine
+
+
+def Session():
+    """A new ORM session on the configured engine; drop-in for a bound ``sessionmaker``."""
+    get_engine()
+    return _sessionmaker()
+
+
+def is_postgres():
+    return get_engine().dialect.name == "postgresql"
+
+
+def _measure_import_times():
+    import subprocess
+    import sys
+
+    modules = ["lingua.database.models", "lingua.database.crud", "lingua.database.connection"]
+    for module in modules:
+        code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+        runs = sorted(
+            float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+            for _ in range(5)
+        )
+        print(f"{module:<30} {runs[len(runs) // 2]:>8.1f} ms (median of {len(runs)} cold imports)")
+
+
+if __name__ == "__main__":
+    _measure_import_times()
@@ -1,26 +1,27 @@
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from lingua.database.models import AlphabetURL, WordUrl, WordDefinition, Base
-from dotenv import load_dotenv
-import os
+from sqlalchemy import insert, update, delete, func, select, text, cast, literal, Float
+from sqlalchemy.orm import aliased
+from lingua.database.models import AlphabetURL, WordUrl, WordDefinition, GlossaryEntry, GlossaryTerm, RefreshState, Base
+from lingua.database.normalize import normalize_headword
+from lingua.database.connection import Session, get_engine, is_postgres, database_url
 import uuid
-import pandas as pd
+import csv
+import io
 
-load_dotenv()
 
-_USER = os.getenv("user")
-_PWD = os.getenv("password")
-_HOST = os.getenv("host")
-_PORT = os.getenv("port")
-_DBNAME = os.getenv("dbname")
-
-DATABASE_URL = f"postgresql+psycopg2://{_USER}:{_PWD}@{_HOST}:{_PORT}/{_DBNAME}?sslmode=require"
-
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
+def __getattr__(name):
+    # `engine` and `DATABASE_URL` used to be built at import; keep them reachable, lazily
+    if name == "engine":
+        return get_engine()
+    if name == "DATABASE_URL":
+        return database_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def init_db():
+    engine = get_engine()
+    if is_postgres():
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
     Base.metadata.create_all(bind=engine)
     print("Tables created!")
 
@@ -94,6 +95,41 @@ def add_word(alphabet, word_url, needs_review=True):
     finally:
         session.close()
 
+def add_words(alphabet, word_urls, needs_review=True):
+    """
+    Bulk counterpart of `add_word`: inserts all `word_urls` for `alphabet` in one commit.
+    """
+    session = Session()
+    try:
+        words = [
+            WordUrl(
+                word_uuid=uuid.uuid4(),
+                alphabet=alphabet,
+                word_url=word_url,
+                needs_review=needs_review
+            )
+            for word_url in word_urls
+        ]
+        session.add_all(words)
+        session.commit()
+        return [word.word_uuid for word in words]
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+def get_word_urls_by_alphabet(alphabet, include_deleted=True):
+    session = Session()
+    try:
+        query = session.query(WordUrl.word_url).filter_by(alphabet=alphabet)
+        if not include_deleted:
+            query = query.filter(WordUrl.is_deleted == False)
+        rows = query.all()
+        return {row.word_url for row in rows}
+    finally:
+        session.close()
+
 def get_words_by_alphabet(alphabet):
     session = Session()
     try:
@@ -145,6 +181,96 @@ def update_word_needs_review(word_uuid):
         print(f"Error updating needs_review flag: {e}")
         session.rollback()
 
+def get_word_url_index():
+    """
+    Maps every stored word URL to (word_uuid, has_definitions), for bulk loaders
+    that need to skip or complete words that are already in the database.
+    """
+    session = Session()
+    try:
+        has_definitions = (
+            session.query(WordDefinition.word_uuid)
+            .filter(WordDefinition.word_uuid == WordUrl.word_uuid)
+            .exists()
+        )
+        rows = session.query(WordUrl.word_url, WordUrl.word_uuid, has_definitions).all()
+        return {word_url: (word_uuid, has_defs) for word_url, word_uuid, has_defs in rows}
+    finally:
+        session.close()
+
+def bulk_load_words(word_rows, definition_rows, reviewed_word_uuids=(), revision_rows=()):
+    """
+    Loads a batch of word_url and word_definition rows (lists of column dicts) in
+    one transaction, clears needs_review for `reviewed_word_uuids` and applies
+    `revision_rows` (word_uuid, rev_id, rev_timestamp) to existing words.
+    """
+    session = Session()
+    try:
+        if word_rows:
+            session.execute(insert(WordUrl), word_rows)
+        if definition_rows:
+            session.execute(insert(WordDefinition), definition_rows)
+        if reviewed_word_uuids:
+            session.query(WordUrl).filter(WordUrl.word_uuid.in_(list(reviewed_word_uuids))).update(
+                {WordUrl.needs_review: False}, synchronize_session=False
+            )
+        if revision_rows:
+            session.execute(update(WordUrl), list(revision_rows))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+def get_word_revision_index():
+    """Maps every stored word URL to (word_uuid, rev_id); rev_id is None for words never tracked."""
+    session = Session()
+    try:
+        rows = session.query(WordUrl.word_url, WordUrl.word_uuid, WordUrl.rev_id).filter(WordUrl.is_deleted == False).all()
+        return {word_url: (word_uuid, rev_id) for word_url, word_uuid, rev_id in rows}
+    finally:
+        session.close()
+
+def get_latest_revision_timestamp():
+    session = Session()
+    try:
+        return session.query(func.max(WordUrl.rev_timestamp)).scalar()
+    finally:
+        session.close()
+
+def update_word_revisions(revision_rows):
+    """Records rev_id/rev_timestamp for words whose definitions are already current."""
+    session = Session()
+    try:
+        session.execute(update(WordUrl), list(revision_rows))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+def get_refresh_high_water(name):
+    session = Session()
+    try:
+        state = session.get(RefreshState, name)
+        return state.high_water if state else None
+    finally:
+        session.close()
+
+def set_refresh_high_water(name, high_water):
+    """Records that everything before `high_water` was processed by job `name`."""
+    session = Session()
+    try:
+        session.merge(RefreshState(name=name, high_water=high_water))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
 # ---------- WORD DEFINITIONS CRUD ----------
 
 
@@ -166,6 +292,45 @@ def insert_word_definitions(word_uuid, definitions, word_text):
         session.rollback()
 
 
+def refresh_word_definitions(updates):
+    """
+    Replaces the definitions of re-fetched words in one transaction. Each update is a
+    dict with word_uuid, word, definitions, rev_id and rev_timestamp. Previous
+    definitions are soft deleted; words that no longer yield definitions go back to review.
+    """
+    session = Session()
+    try:
+        word_uuids = [u["word_uuid"] for u in updates]
+        session.query(WordDefinition).filter(
+            WordDefinition.word_uuid.in_(word_uuids),
+            WordDefinition.is_deleted == False
+        ).update({WordDefinition.is_deleted: True}, synchronize_session=False)
+
+        definition_rows = [
+            {"word_uuid": u["word_uuid"], "definition": definition, "word": u["word"], "is_deleted": False}
+            for u in updates
+            for definition in u["definitions"]
+        ]
+        if definition_rows:
+            session.execute(insert(WordDefinition), definition_rows)
+
+        session.execute(update(WordUrl), [
+            {
+                "word_uuid": u["word_uuid"],
+                "rev_id": u["rev_id"],
+                "rev_timestamp": u["rev_timestamp"],
+                "needs_review": not u["definitions"],
+            }
+            for u in updates
+        ])
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+
 def get_all_word_definitions():
     session = Session()
     try:
@@ -178,11 +343,270 @@ def get_all_word_definitions():
 
     
 def get_all_word_definitions_as_dataframe():
+    import pandas as pd
+
     session = Session()
     try:
-        query = session.query(WordDefinition.word, WordDefinition.definition)
+        query = session.query(WordDefinition.word, WordDefinition.definition).filter(WordDefinition.is_deleted == False)
         return pd.read_sql(query.statement, session.bind)
     except Exception as e:
         print(f"Error fetching words for review: {e}")
         session.rollback()
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
+
+
+def iter_word_definitions(batch_size=10000):
+    """Stream (word, definition) pairs of every live definition without loading the table."""
+    session = Session()
+    try:
+        query = (
+            select(WordDefinition.word, WordDefinition.definition)
+            .where(WordDefinition.is_deleted == False)
+            .execution_options(yield_per=batch_size)
+        )
+        for word, definition in session.execute(query):
+            yield word, definition
+    finally:
+        session.close()
+
+
+def backfill_normalized_words(batch_size=10000):
+    """
+    Fills word_definition.normalized_word for rows written before the column
+    existed, walking the table in primary-key order one batch per transaction.
+    """
+    session = Session()
+    updated = 0
+    last_uuid = None
+    try:
+        while True:
+            query = session.query(WordDefinition.definition_uuid, WordDefinition.word).filter(
+                WordDefinition.normalized_word == None
+            )
+            if last_uuid is not None:
+                query = query.filter(WordDefinition.definition_uuid > last_uuid)
+            rows = query.order_by(WordDefinition.definition_uuid).limit(batch_size).all()
+            if not rows:
+                break
+            session.execute(update(WordDefinition), [
+                {"definition_uuid": definition_uuid, "normalized_word": normalize_headword(word)}
+                for definition_uuid, word in rows
+            ])
+            session.commit()
+            updated += len(rows)
+            last_uuid = rows[-1].definition_uuid
+        print(f"✅ Normalized {updated} headwords.")
+        return updated
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+
+def _headword_key():
+    """word_definition.normalized_word as ix_word_definition_normalized_word_c indexes it ("C" collation on PostgreSQL)."""
+    return WordDefinition.normalized_word.collate("C") if is_postgres() else WordDefinition.normalized_word
+
+
+def search_words(query, mode="fuzzy", limit=20, min_similarity=0.3):
+    """
+    Looks up headwords by their normalized form (see normalize_headword).
+
+    mode="exact" matches the normalized headword, mode="prefix" returns headwords
+    starting with the query in code point order (so the query itself first, then
+    its extensions), and mode="fuzzy" ranks headwords by pg_trgm similarity (at
+    least `min_similarity`, PostgreSQL only). Returns up to `limit` dicts with
+    word, normalized_word, score and definitions, best match first.
+    """
+    key = normalize_headword(query)
+    if not key:
+        return []
+
+    column = WordDefinition.normalized_word
+    session = Session()
+    try:
+        # Exact and prefix lookups read the headword index in order and stop at `limit`
+        ordered = _headword_key()
+        if mode == "exact":
+            score = literal(1.0)
+            condition = ordered == key
+        elif mode == "prefix":
+            escaped = key.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            score = cast(len(key), Float) / func.length(ordered)
+            condition = ordered.like(f"{escaped}%", escape="\\")
+        elif mode == "fuzzy":
+            if not is_postgres():
+                raise ValueError("Fuzzy search needs PostgreSQL with pg_trgm; use mode='exact' or 'prefix'")
+            # `%` uses the GIN trigram index with this threshold, for this transaction only
+            session.execute(select(func.set_config("pg_trgm.similarity_threshold", str(min_similarity), True)))
+            score = func.similarity(column, key)
+            condition = column.op("%")(key)
+        else:
+            raise ValueError(f"Unknown search mode: {mode}")
+        group_by = column if mode == "fuzzy" else ordered
+        order_by = [score.desc(), column] if mode == "fuzzy" else [ordered]
+
+        headwords = (
+            session.query(group_by, func.min(WordDefinition.word), score.label("score"))
+            .filter(condition, WordDefinition.is_deleted == False)
+            .group_by(group_by)
+            .order_by(*order_by)
+            .limit(limit)
+            .all()
+        )
+        if not headwords:
+            return []
+
+        definitions = {}
+        rows = (
+            session.query(column, WordDefinition.definition)
+            .filter(ordered.in_([h[0] for h in headwords]), WordDefinition.is_deleted == False)
+            .all()
+        )
+        for normalized_word, definition in rows:
+            definitions.setdefault(normalized_word, []).append(definition)
+
+        return [
+            {
+                "word": word,
+                "normalized_word": normalized_word,
+                "score": float(score),
+                "definitions": definitions.get(normalized_word, []),
+            }
+            for normalized_word, word, score in headwords
+        ]
+    finally:
+        session.close()
+
+
+# ---------- GLOSSARY CRUD ----------
+
+_GLOSSARY_ENTRY_COLUMNS = ["entry_uuid", "source", "row_number"]
+_GLOSSARY_TERM_COLUMNS = ["term_uuid", "entry_uuid", "language", "raw_text", "word", "meaning", "normalized_word"]
+
+
+def _copy_rows(session, table, columns, rows):
+    """Streams `rows` into `table` with COPY ... FROM STDIN on the session's connection."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[c] is None else str(row[c]) for c in columns])
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    connection = session.connection()
+    cursor = connection.connection.cursor()
+    try:
+        if connection.dialect.driver == "psycopg":
+            # psycopg 3 (postgresql+psycopg://) streams through cursor.copy(); copy_expert is psycopg2 only
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+    finally:
+        cursor.close()
+
+
+def replace_glossary(source, batches):
+    """
+    Replaces every entry of glossary `source` in one transaction. `batches` yields
+    (entry_rows, term_rows) lists of column dicts; on PostgreSQL each batch is
+    loaded with COPY, elsewhere with executemany inserts. Returns (entries, terms).
+    """
+    session = Session()
+    entries = terms = 0
+    try:
+        old_entries = select(GlossaryEntry.entry_uuid).where(GlossaryEntry.source == source)
+        session.execute(delete(GlossaryTerm).where(GlossaryTerm.entry_uuid.in_(old_entries)))
+        session.execute(delete(GlossaryEntry).where(GlossaryEntry.source == source))
+
+        copy = is_postgres()
+        for entry_rows, term_rows in batches:
+            if copy:
+                _copy_rows(session, GlossaryEntry.__tablename__, _GLOSSARY_ENTRY_COLUMNS, entry_rows)
+                _copy_rows(session, GlossaryTerm.__tablename__, _GLOSSARY_TERM_COLUMNS, term_rows)
+            else:
+                if entry_rows:
+                    session.execute(insert(GlossaryEntry), entry_rows)
+                if term_rows:
+                    session.execute(insert(GlossaryTerm), term_rows)
+            entries += len(entry_rows)
+            terms += len(term_rows)
+        session.commit()
+        return entries, terms
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+
+def get_glossary_pairs(source_language, target_language, source=None):
+    """(word, word) pairs of the same glossary entry in two languages, e.g. ("ml", "kn")."""
+    source_term, target_term = aliased(GlossaryTerm), aliased(GlossaryTerm)
+    session = Session()
+    try:
+        query = (
+            session.query(source_term.word, target_term.word)
+            .join(target_term, target_term.entry_uuid == source_term.entry_uuid)
+            .filter(source_term.language == source_language, target_term.language == target_language)
+        )
+        if source is not None:
+            query = query.join(GlossaryEntry, GlossaryEntry.entry_uuid == source_term.entry_uuid).filter(
+                GlossaryEntry.source == source
+            )
+        return query.all()
+    finally:
+        session.close()
+
+
+def _in_glossary_source(source):
+    """EXISTS clause: the GlossaryTerm headword is also a term, in the same language, of glossary `source`."""
+    other_term = aliased(GlossaryTerm)
+    return (
+        select(other_term.term_uuid)
+        .join(GlossaryEntry, GlossaryEntry.entry_uuid == other_term.entry_uuid)
+        .where(
+            other_term.language == GlossaryTerm.language,
+            other_term.normalized_word == GlossaryTerm.normalized_word,
+            GlossaryEntry.source == source,
+        )
+        .exists()
+    )
+
+
+def get_glossary_terms(language="ml", in_definitions=None, source=None, in_source=None, not_in_source=None):
+    """
+    (word, meaning) pairs of the glossary terms in `language`, optionally of one
+    glossary `source`. With in_definitions=True only headwords that also have a
+    live word_definition are returned, with False only those that don't.
+    in_source/not_in_source keep only headwords that are/aren't in another
+    glossary source; the notebook's held-out test split is
+    ``get_glossary_terms("ml", source="samam", not_in_source="datuk")``. All of
+    these are index joins on normalized_word.
+    """
+    session = Session()
+    try:
+        query = session.query(GlossaryTerm.word, GlossaryTerm.meaning).filter(GlossaryTerm.language == language)
+        if source is not None:
+            query = query.join(GlossaryEntry, GlossaryEntry.entry_uuid == GlossaryTerm.entry_uuid).filter(
+                GlossaryEntry.source == source
+            )
+        if in_definitions is not None:
+            defined = (
+                session.query(WordDefinition.definition_uuid)
+                .filter(
+                    _headword_key() == GlossaryTerm.normalized_word,
+                    WordDefinition.is_deleted == False
+                )
+                .exists()
+            )
+            query = query.filter(defined if in_definitions else ~defined)
+        if in_source is not None:
+            query = query.filter(_in_glossary_source(in_source))
+        if not_in_source is not None:
+            query = query.filter(~_in_glossary_source(not_in_source))
+        return query.all()
+    finally:
+        session.close()
+
@@ -1,13 +1,41 @@
 import uuid
+from datetime import timezone
 from sqlalchemy import (
-    Column, String, Text, Boolean, ForeignKey
+    Column, String, Text, Boolean, ForeignKey, BigInteger, DateTime, Index, Uuid, Integer, UniqueConstraint
 )
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
+from lingua.database.normalize import normalize_headword
 
 Base = declarative_base()
 
+
+def _normalized_word_default(context):
+    return normalize_headword(context.get_current_parameters().get("word"))
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-aware UTC datetimes on every backend. PostgreSQL keeps the zone;
+    SQLite stores naive values, which are written and read back as UTC here.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+            if dialect.name == "sqlite":
+                value = value.replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
 class AlphabetURL(Base):
     __tablename__ = 'alphabet_url'
 
@@ -21,23 +49,87 @@ class AlphabetURL(Base):
 class WordUrl(Base):
     __tablename__ = 'word_url'
 
-    word_uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    word_uuid = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     alphabet = Column(String(5), ForeignKey("alphabet_url.alphabet"))
     word_url = Column(Text, nullable=False)
     needs_review = Column(Boolean, default=True)
     is_deleted = Column(Boolean, default=False)
+    rev_id = Column(BigInteger)  # page revision the definitions were taken from
+    rev_timestamp = Column(UTCDateTime, index=True)
 
     alphabet_rel = relationship("AlphabetURL", back_populates="words")
     definitions = relationship("WordDefinition", back_populates="word_rel", cascade="all, delete-orphan")
 
 
+class RefreshState(Base):
+    """Where an incremental job left off, e.g. the start of the last complete definition refresh."""
+    __tablename__ = 'refresh_state'
+
+    name = Column(String(50), primary_key=True)
+    high_water = Column(UTCDateTime, nullable=False)  # everything before this was processed
+
+
 class WordDefinition(Base):
     __tablename__ = 'word_definition'
 
-    definition_uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    word_uuid = Column(UUID(as_uuid=True), ForeignKey("word_url.word_uuid"), nullable=False)
+    definition_uuid = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    word_uuid = Column(Uuid(as_uuid=True), ForeignKey("word_url.word_uuid"), nullable=False)
     definition = Column(Text, nullable=False)
     is_deleted = Column(Boolean, default=False)
     word = Column(Text, nullable=False)
+    normalized_word = Column(Text, default=_normalized_word_default)  # lookup key, see normalize_headword
 
     word_rel = relationship("WordUrl", back_populates="definitions")
+
+    __table_args__ = (
+        # SQLite compares bytes already; PostgreSQL gets the "C"-collated index below
+        Index("ix_word_definition_normalized_word", "normalized_word").ddl_if(dialect="sqlite"),
+        Index(
+            "ix_word_definition_normalized_word_trgm",
+            "normalized_word",
+            postgresql_using="gin",
+            postgresql_ops={"normalized_word": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# Byte-order keys: one btree serves equality, anchored LIKE and ORDER BY, so a
+# prefix search reads the index in order and stops after `limit` headwords
+Index("ix_word_definition_normalized_word_c", WordDefinition.normalized_word.collate("C")).ddl_if(dialect="postgresql")
+
+
+class GlossaryEntry(Base):
+    """One row of a multilingual glossary (e.g. the Samam glossary CSV)."""
+    __tablename__ = 'glossary_entry'
+
+    entry_uuid = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    source = Column(String(50), nullable=False)
+    row_number = Column(Integer, nullable=False)  # position in the source file, for idempotent reloads
+
+    terms = relationship("GlossaryTerm", back_populates="entry_rel", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        UniqueConstraint("source", "row_number", name="uq_glossary_entry_source_row_number"),
+    )
+
+
+class GlossaryTerm(Base):
+    """The term of a glossary entry in one language, split into word and meaning."""
+    __tablename__ = 'glossary_term'
+
+    term_uuid = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    entry_uuid = Column(Uuid(as_uuid=True), ForeignKey("glossary_entry.entry_uuid", ondelete="CASCADE"), nullable=False)
+    language = Column(String(5), nullable=False)  # ISO 639-1: ml, kn, ta, te
+    raw_text = Column(Text, nullable=False)
+    word = Column(Text, nullable=False)
+    meaning = Column(Text)
+    normalized_word = Column(Text)  # see normalize_headword; joins against word_definition.normalized_word
+
+    entry_rel = relationship("GlossaryEntry", back_populates="terms")
+
+    __table_args__ = (
+        # Cross-lingual pairs: the terms of one entry, by language
+        UniqueConstraint("entry_uuid", "language", name="uq_glossary_term_entry_uuid_language"),
+        # Overlap joins with other sources on the normalized headword
+        Index("ix_glossary_term_language_normalized_word", "language", "normalized_word"),
+    )
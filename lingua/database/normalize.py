@@ -0,0 +1,46 @@
+"""
+Normalization of Malayalam headwords for indexing and lookup.
+
+Headwords taken from URLs or typed by users come in several encodings of the
+same word: NFC vs NFD, legacy chillus (consonant + virama + ZWJ) vs the atomic
+chillu code points, stray ZWJ/ZWNJ used only to steer rendering, and
+underscores in place of spaces. `normalize_headword` maps all of them to one key.
+"""
+import unicodedata
+import re
+
+_VIRAMA = "\u0d4d"
+_ZWJ = "\u200d"
+
+# Legacy "consonant + virama + ZWJ" sequences and their atomic chillu (Unicode 5.1+)
+_CHILLUS = {
+    "\u0d23": "\u0d7a",  # ണ -> ൺ
+    "\u0d28": "\u0d7b",  # ന -> ൻ
+    "\u0d30": "\u0d7c",  # ര -> ർ
+    "\u0d32": "\u0d7d",  # ല -> ൽ
+    "\u0d33": "\u0d7e",  # ള -> ൾ
+    "\u0d15": "\u0d7f",  # ക -> ൿ
+    "\u0d2e": "\u0d54",  # മ -> ൔ
+    "\u0d2f": "\u0d55",  # യ -> ൕ
+    "\u0d34": "\u0d56",  # ഴ -> ൖ
+}
+_LEGACY_CHILLU = re.compile(f"([{''.join(_CHILLUS)}]){_VIRAMA}{_ZWJ}")
+
+# Zero-width joiners/non-joiners, zero-width space, soft hyphen and BOM
+_INVISIBLE = re.compile("[\u200b\u200c\u200d\u00ad\ufeff]")
+_WHITESPACE = re.compile(r"[\s_]+")
+
+
+def normalize_headword(text):
+    """
+    The lookup key of a headword: NFC, atomic chillus, no zero-width characters,
+    single spaces instead of underscores/whitespace runs, and case folded (for
+    the English entries).
+    """
+    if text is None:
+        return None
+    text = unicodedata.normalize("NFC", text)
+    text = _LEGACY_CHILLU.sub(lambda m: _CHILLUS[m.group(1)], text)
+    text = _INVISIBLE.sub("", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text.casefold()
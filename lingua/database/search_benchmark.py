@@ -0,0 +1,141 @@
+"""
+Latency benchmark for `crud.search_words`.
+
+``python -m lingua.database.search_benchmark --populate 1000000``
+
+Run it against a scratch database: ``--populate`` tops ``word_definition`` up
+to the given number of synthetic headwords (every tenth one ending in a chillu)
+before measuring. Queries are typed the way users and URLs produce them:
+legacy chillus, NFD, stray ZWNJ, prefixes and misspellings. The benchmark
+reports p50/p95/p99 latency per mode and checks p95 against the targets.
+``--modes`` picks the modes to measure; fuzzy is skipped on SQLite and on
+PostgreSQL without pg_trgm, where `crud.search_words` cannot run it.
+"""
+from urllib.parse import quote
+import unicodedata
+import argparse
+import random
+import time
+import uuid
+
+from sqlalchemy import text
+
+from lingua.database import crud
+from lingua.database.models import WordDefinition
+from lingua.database.normalize import normalize_headword
+from lingua.data.synthetic_wiki import alphabets, synthetic_word
+
+_TARGET_P95_MS = {"exact": 2.0, "prefix": 10.0, "fuzzy": 50.0}
+_INSERT_BATCH_SIZE = 10000
+_LEGACY_CHILLU_N = "\u0d28\u0d4d\u200d"  # ന + virama + ZWJ, legacy form of ൻ
+
+
+def _synthetic_headword(index):
+    alphabet_list = alphabets(40)
+    word = synthetic_word(alphabet_list[index % len(alphabet_list)], index // len(alphabet_list))
+    return word + "ൻ" if index % 10 == 0 else word
+
+
+def populate(total):
+    """Insert synthetic headwords until word_definition holds at least `total` rows."""
+    session = crud.Session()
+    try:
+        existing = session.query(WordDefinition).count()
+    finally:
+        session.close()
+
+    for alphabet in alphabets(40):
+        crud.upsert_alphabet(alphabet, f"https://ml.wiktionary.org/wiki/Special:PrefixIndex/{alphabet}")
+
+    for start in range(existing, total, _INSERT_BATCH_SIZE):
+        word_rows, definition_rows = [], []
+        for index in range(start, min(total, start + _INSERT_BATCH_SIZE)):
+            word = _synthetic_headword(index)
+            word_uuid = uuid.uuid4()
+            word_rows.append({
+                "word_uuid": word_uuid,
+                "alphabet": word[0],
+                "word_url": f"https://ml.wiktionary.org/wiki/{quote(word)}",
+                "needs_review": False,
+            })
+            definition_rows.append({"word_uuid": word_uuid, "definition": f"{word} (benchmark)", "word": word})
+        crud.bulk_load_words(word_rows, definition_rows)
+        print(f"Inserted {min(total, start + _INSERT_BATCH_SIZE)}/{total}", end="\r")
+
+    with crud.engine.begin() as connection:
+        connection.execute(text("ANALYZE word_definition"))
+
+
+def fuzzy_available():
+    """Whether fuzzy search can run here: PostgreSQL with the pg_trgm extension installed."""
+    if not crud.is_postgres():
+        return False
+    with crud.engine.connect() as connection:
+        return connection.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+
+def _query_variants(word, rng):
+    """How the same headword reaches the lookup: (mode, query) pairs."""
+    legacy = word.replace("ൻ", _LEGACY_CHILLU_N)
+    misspelt = word[:-1] + rng.choice("കചടതപ") if len(word) > 3 else word
+    return [
+        ("exact", rng.choice([legacy, unicodedata.normalize("NFD", word), word[:1] + "\u200c" + word[1:]])),
+        ("prefix", word[:3]),
+        ("fuzzy", misspelt),
+    ]
+
+
+def run(n_queries=200, limit=20, seed=0, modes=tuple(_TARGET_P95_MS)):
+    rng = random.Random(seed)
+    session = crud.Session()
+    try:
+        sample = [row[0] for row in session.query(WordDefinition.word).limit(n_queries * 50).all()]
+    finally:
+        session.close()
+    words = rng.sample(sample, min(n_queries, len(sample)))
+
+    timings = {mode: [] for mode in modes}
+    misses = 0
+    for word in words:
+        for mode, query in _query_variants(word, rng):
+            if mode not in timings:
+                continue
+            start = time.perf_counter()
+            results = crud.search_words(query, mode=mode, limit=limit)
+            timings[mode].append((time.perf_counter() - start) * 1000)
+            if mode == "exact" and not any(r["normalized_word"] == normalize_headword(word) for r in results):
+                misses += 1
+
+    print(f"{'mode':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'target':>8}")
+    passed = True
+    for mode, values in timings.items():
+        values.sort()
+        p50, p95, p99 = (values[int(q * (len(values) - 1))] for q in (0.5, 0.95, 0.99))
+        ok = p95 <= _TARGET_P95_MS[mode]
+        passed = passed and ok
+        print(f"{mode:>8} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {_TARGET_P95_MS[mode]:>7.1f}{'' if ok else ' ❌'}")
+    if "exact" in timings:
+        print(f"Exact lookups of variant spellings that missed: {misses}/{len(words)}")
+    return passed and misses == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark headword search latency")
+    parser.add_argument("--populate", type=int, default=0, help="top the table up to this many synthetic headwords first")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--modes", nargs="+", choices=list(_TARGET_P95_MS), default=list(_TARGET_P95_MS))
+    args = parser.parse_args()
+
+    modes = args.modes
+    if "fuzzy" in modes and not fuzzy_available():
+        print("Skipping fuzzy mode: it needs PostgreSQL with the pg_trgm extension")
+        modes = [mode for mode in modes if mode != "fuzzy"]
+    if args.populate:
+        populate(args.populate)
+    ok = run(args.queries, args.limit, modes=modes)
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()